@@ -0,0 +1,286 @@
+"""Latency and throughput benchmarks against synthetic data.
+
+Runs against a separate database (BENCH_DB_NAME, default "<DB_NAME>_bench")
+which is dropped and re-seeded on every run.
+
+Usage:
+    python backend/benchmark.py search [--universities 50000] [--queries 200]
+    python backend/benchmark.py export [--applications 100000]
+    python backend/benchmark.py login [--logins 200] [--concurrency 20]
+    python backend/benchmark.py serve [--universities 50000] [--workers 1,2,4] [--connections 64] [--duration 10]
+
+`serve` starts the production server (gunicorn.conf.py) on the bench
+database once per worker count and measures GET /api/universities over
+keep-alive connections. The load generator is a single process: on a small
+machine it competes with the workers for CPU, so run it with more cores than
+the largest worker count, or point a separate load tool at the same setup.
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from server import (
+    EXPORT_WRITERS, _hash_password, _verify_password, client, ensure_search_index, export_applications,
+    normalize_search_query, university_derived_fields, verify_password,
+)
+
+# CPUs this process may run on; os.cpu_count() reports the whole host
+CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+bench_db = client[os.environ.get('BENCH_DB_NAME', f"{os.environ['DB_NAME']}_bench")]
+
+CITIES = ["Lucknow", "Kanpur", "Varanasi", "Noida", "Aligarh", "Agra", "Prayagraj", "Meerut", "Gorakhpur", "Bareilly"]
+STATES = ["Uttar Pradesh", "Delhi", "Bihar", "Uttarakhand", "Madhya Pradesh"]
+CATEGORIES = ["Engineering", "Medical", "Management", "Law", "Pharmacy", "Arts", "Science", "Commerce"]
+COURSES = ["B.Tech", "M.Tech", "MBA", "BBA", "MCA", "BCA", "MBBS", "B.Pharma", "LLB", "B.Sc", "M.Sc", "B.Com", "Ph.D"]
+NAME_WORDS = ["Institute", "University", "College", "Technology", "Science", "National", "Central", "Integral", "Amity", "Global"]
+QUERIES = ["btech", "B.Tech", "MBA", "Lucknow", "luckn", "engineering", "medical college", "Kanpur MBA", "ph.d", "pharma"]
+
+def synthetic_university(i: int) -> dict:
+    city = random.choice(CITIES)
+    doc = {
+        "id": str(uuid.uuid4()),
+        "name": f"{' '.join(random.sample(NAME_WORDS, 2))} {city} {i}",
+        "location": city,
+        "state": random.choice(STATES),
+        "university_categories": random.sample(CATEGORIES, 2),
+        "main_photo": "",
+        "photo_gallery": [],
+        "description": " ".join(random.choices(NAME_WORDS + CATEGORIES + CITIES, k=40)),
+        "courses": [
+            {"course_name": c, "description": "", "duration": "", "fees": float(random.randint(20, 250) * 1000), "category": random.choice(CATEGORIES)}
+            for c in random.sample(COURSES, 4)
+        ],
+        "placement_percentage": round(random.uniform(40, 99), 1),
+        "rating": round(random.uniform(2, 5), 1),
+        "tags": random.sample(CATEGORIES, 2),
+        "contact_details": {},
+        "created_at": datetime(2024, 1, 10, 10, 0, tzinfo=timezone.utc),
+    }
+    doc.update(university_derived_fields(doc))
+    return doc
+
+async def seed_catalog(count: int):
+    await bench_db.universities.drop()
+    batch = []
+    for i in range(count):
+        batch.append(synthetic_university(i))
+        if len(batch) == 1000:
+            await bench_db.universities.insert_many(batch)
+            batch = []
+    if batch:
+        await bench_db.universities.insert_many(batch)
+
+def synthetic_application(i: int) -> dict:
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+    return {
+        "id": str(uuid.uuid4()),
+        "university_id": f"uni-{i % 50:03d}",
+        "university_name": f"{random.choice(NAME_WORDS)} {random.choice(CITIES)}",
+        "name": f"Student {i}",
+        "email": f"student{i}@example.com",
+        "phone": f"+91-9{i:09d}",
+        "course_interest": random.choice(COURSES),
+        "short_note": " ".join(random.choices(NAME_WORDS + CATEGORIES, k=12)),
+        "status": random.choice(["pending", "contacted", "admitted", "rejected"]),
+        "created_at": created_at,
+    }
+
+async def seed_applications(count: int):
+    await bench_db.applications.drop()
+    batch = []
+    for i in range(count):
+        batch.append(synthetic_application(i))
+        if len(batch) == 1000:
+            await bench_db.applications.insert_many(batch)
+            batch = []
+    if batch:
+        await bench_db.applications.insert_many(batch)
+
+def report(label: str, samples: list):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<10} p50={statistics.median(samples):8.2f}ms  p99={p99:8.2f}ms  n={len(samples)}")
+
+async def bench_search(args):
+    print(f"Seeding {args.universities} synthetic universities...")
+    await seed_catalog(args.universities)
+
+    async def regex_search(term):
+        fields = ['name', 'tags', 'location', 'state', 'courses.course_name', 'courses.category', 'description']
+        query = {'$or': [{f: {'$regex': term, '$options': 'i'}} for f in fields]}
+        return await bench_db.universities.find(query, {"_id": 0}).to_list(1000)
+
+    async def text_search(term):
+        return await bench_db.universities.find(
+            {'$text': {'$search': normalize_search_query(term)}},
+            {"_id": 0, "search_terms": 0, "score": {'$meta': 'textScore'}}
+        ).sort([('score', {'$meta': 'textScore'})]).to_list(1000)
+
+    # Regex baseline runs before the text index exists so it scans like production did
+    for label, search in (("regex", regex_search), ("text", text_search)):
+        if label == "text":
+            await ensure_search_index(bench_db.universities)
+        samples = []
+        for i in range(args.queries):
+            term = QUERIES[i % len(QUERIES)]
+            started = time.perf_counter()
+            await search(term)
+            samples.append((time.perf_counter() - started) * 1000)
+        report(label, samples)
+
+async def bench_export(args):
+    print(f"Seeding {args.applications} synthetic applications...")
+    await seed_applications(args.applications)
+
+    for export_format in EXPORT_WRITERS:
+        started = time.perf_counter()
+        output, _ = await export_applications({}, export_format, bench_db.applications)
+        elapsed = time.perf_counter() - started
+        size = output.seek(0, os.SEEK_END)
+        output.close()
+        print(f"{export_format:<10} {args.applications / elapsed:10.0f} rows/s  {elapsed:6.2f}s  {size / 1e6:6.1f}MB")
+
+async def bench_login(args):
+    """Login throughput, and event-loop lag seen by other requests, while bcrypt runs.
+
+    "inline" verifies on the event loop as the handlers used to; "executor"
+    goes through the password pool. The lag probe stands in for a non-login
+    request: it asks to wake every 10ms and records how late it wakes.
+    """
+    password = "correct horse battery staple"
+    hashed = _hash_password(password)
+
+    async def inline_verify():
+        return _verify_password(password, hashed)
+
+    async def executor_verify():
+        return await verify_password(password, hashed)
+
+    for label, verify in (("inline", inline_verify), ("executor", executor_verify)):
+        lag = []
+        done = asyncio.Event()
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lag.append((time.perf_counter() - started - 0.01) * 1000)
+
+        remaining = iter(range(args.logins))
+
+        async def login_worker():
+            for _ in remaining:
+                await verify()
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+        print(f"{label:<10} {args.logins / elapsed:8.1f} logins/s")
+        report(f"{label} lag", lag)
+
+SERVE_PATH = "/api/universities?limit=20"
+
+async def http_client(host: str, port: int, deadline: float, samples: list):
+    """Send GETs back to back on one keep-alive connection until the deadline."""
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {SERVE_PATH} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head.startswith(b"HTTP/1.1 200"):
+                raise RuntimeError(f"Unexpected response: {head.splitlines()[0].decode()}")
+            length = int(re.search(rb"(?i)content-length: *(\d+)", head).group(1))
+            await reader.readexactly(length)
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        writer.close()
+
+async def wait_for_server(host: str, port: int, server: subprocess.Popen, timeout: float = 60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            await asyncio.wait_for(http_client(host, port, time.perf_counter() + 0.1, []), 10)
+            return
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            await asyncio.sleep(0.5)
+    raise RuntimeError("Server did not start in time")
+
+async def bench_serve(args):
+    """Requests/s of the public listing per worker count, with the scaling factor over one worker."""
+    print(f"Seeding {args.universities} synthetic universities...")
+    await seed_catalog(args.universities)
+
+    host = "127.0.0.1"
+    env = {
+        **os.environ,
+        "DB_NAME": bench_db.name,
+        "PORT": str(args.port),
+        "GUNICORN_ACCESS_LOG": "",
+    }
+    baseline = None
+    for workers in (int(n) for n in args.workers.split(",")):
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "server:app", "-c", "gunicorn.conf.py",
+             "--workers", str(workers), "--bind", f"{host}:{args.port}"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            await wait_for_server(host, args.port, server)
+            # Warm up every worker's connection pool before measuring
+            await asyncio.gather(*(http_client(host, args.port, time.perf_counter() + 2, []) for _ in range(args.connections)))
+            samples = []
+            deadline = time.perf_counter() + args.duration
+            await asyncio.gather(*(http_client(host, args.port, deadline, samples) for _ in range(args.connections)))
+        finally:
+            server.terminate()
+            server.wait()
+        rps = len(samples) / args.duration
+        baseline = baseline or rps
+        print(f"{workers:>2} workers {rps:10.0f} req/s  x{rps / baseline:4.2f}")
+        report("latency", samples)
+
+BENCHMARKS = {
+    "search": bench_search,
+    "export": bench_export,
+    "login": bench_login,
+    "serve": bench_serve,
+}
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run Edu Dham benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--universities", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--applications", type=int, default=100000)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({1, 2, 4, CPUS}) if n <= CPUS),
+                        help="serve: comma-separated worker counts")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8099)
+    args = parser.parse_args()
+    try:
+        await BENCHMARKS[args.benchmark](args)
+    finally:
+        await bench_db.client.drop_database(bench_db.name)
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Production server settings.
+
+Usage (from backend/, as the Dockerfile does):
+    gunicorn server:app -c gunicorn.conf.py
+
+Each worker is a separate process running its own event loop, so throughput
+scales with the number of cores. Uvicorn's worker picks uvloop and httptools
+automatically because they are installed (see requirements.txt).
+
+Environment:
+    PORT                     port to bind (default 8000)
+    WEB_CONCURRENCY          worker processes (default: one per CPU the
+                             container may use, up to GUNICORN_MAX_WORKERS)
+    GUNICORN_MAX_WORKERS     cap on the default worker count (default 8)
+    GUNICORN_PRELOAD         "true" imports the app once before forking the
+                             workers: faster boot and shared memory, but code
+                             changes then need a full restart, not a HUP
+    GUNICORN_TIMEOUT         seconds a silent worker is given before restart
+    GUNICORN_MAX_REQUESTS    recycle a worker after this many requests (0 = never)
+    GUNICORN_ACCESS_LOG      access log file, "-" for stdout (default), empty for none
+"""
+import math
+import os
+
+
+def available_cpus() -> int:
+    """CPUs this process may actually use.
+
+    os.cpu_count() reports the host's cores; a container limited by CPU
+    affinity or a CFS quota gets far less, and one worker per host core
+    would oversubscribe it.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+    quota = period = None
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        try:
+            # cgroup v1: quota is -1 when unlimited
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                quota = f.read().strip()
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = f.read().strip()
+        except OSError:
+            pass
+    try:
+        if quota not in (None, 'max', '-1') and int(period) > 0:
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except ValueError:
+        pass
+    return max(1, cpus)
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(
+    os.environ.get('WEB_CONCURRENCY')
+    or min(available_cpus(), int(os.environ.get('GUNICORN_MAX_WORKERS', '8')))
+)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() in ('1', 'true', 'yes')
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+# On SIGTERM, workers get this long to finish in-flight requests and run the
+# shutdown handlers (stop import workers, drain background tasks)
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+# forwarded_allow_ips keeps gunicorn's default (127.0.0.1, or FORWARDED_ALLOW_IPS).
+# Trusting "*" would make uvicorn take the leftmost X-Forwarded-For entry,
+# which the client controls; rate limits read the client address through
+# TRUSTED_PROXY_HOPS in server.py instead.
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
@@ -0,0 +1,101 @@
+"""Compare, apply and audit the MongoDB indexes declared in server.INDEXES.
+
+Usage:
+    python backend/indexes.py diff
+    python backend/indexes.py apply [--rebuild] [--drop-extra]
+    python backend/indexes.py slow-queries [--enable-profiler] [--slowms 100] [--limit 20]
+
+`slow-queries` reads the database profiler (system.profile), which only
+records operations once profiling is on; `--enable-profiler` turns it on for
+operations slower than --slowms.
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+
+from server import INDEXES, client, db, ensure_indexes, index_diff
+
+async def show_diff(args):
+    in_sync = True
+    for name, changes in (await index_diff()).items():
+        for model in changes["missing"]:
+            print(f"+ {name}.{model.document['name']}")
+        for model in changes["changed"]:
+            print(f"~ {name}.{model.document['name']}")
+        for index_name in changes["extra"]:
+            print(f"- {name}.{index_name}")
+        in_sync = in_sync and not any(changes.values())
+    if in_sync:
+        print("Indexes match the registry")
+
+async def apply_indexes(args):
+    """Create missing indexes; optionally rebuild changed ones and drop unknown ones."""
+    diff = await index_diff()
+    for name, changes in diff.items():
+        if args.rebuild:
+            for model in changes["changed"]:
+                await db[name].drop_index(model.document["name"])
+                await db[name].create_indexes([model])
+                print(f"Rebuilt {name}.{model.document['name']}")
+        if args.drop_extra:
+            for index_name in changes["extra"]:
+                await db[name].drop_index(index_name)
+                print(f"Dropped {name}.{index_name}")
+    await ensure_indexes()
+    await show_diff(args)
+
+def query_shape(value):
+    """Filter with the values blanked out, so queries differing only in values group together."""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [query_shape(item) for item in value[:1]]
+    return 1
+
+async def slow_queries(args):
+    if args.enable_profiler:
+        await db.command("profile", 1, slowms=args.slowms)
+        print(f"Profiler on for operations slower than {args.slowms}ms")
+
+    groups = defaultdict(lambda: {"count": 0, "millis": 0, "docs_examined": 0})
+    async for op in db.system.profile.find({"planSummary": {"$regex": "^COLLSCAN"}}):
+        command = op.get("command", {})
+        collection = op.get("ns", "").split(".", 1)[-1]
+        if collection.startswith("system.") or collection not in INDEXES:
+            continue
+        shape = query_shape(command.get("filter", command.get("q", command.get("query", {}))))
+        group = groups[(collection, op.get("op"), repr(shape))]
+        group["count"] += 1
+        group["millis"] += op.get("millis", 0)
+        group["docs_examined"] = max(group["docs_examined"], op.get("docsExamined", 0))
+
+    if not groups:
+        print("No unindexed operations in system.profile")
+        return
+    ranked = sorted(groups.items(), key=lambda item: item[1]["millis"], reverse=True)
+    print(f"{'collection':<14} {'op':<8} {'count':>6} {'total ms':>9} {'max docs':>9}  filter")
+    for (collection, op, shape), group in ranked[:args.limit]:
+        print(f"{collection:<14} {op:<8} {group['count']:>6} {group['millis']:>9} {group['docs_examined']:>9}  {shape}")
+
+COMMANDS = {
+    "diff": show_diff,
+    "apply": apply_indexes,
+    "slow-queries": slow_queries,
+}
+
+async def main():
+    parser = argparse.ArgumentParser(description="Manage Edu Dham MongoDB indexes")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--rebuild", action="store_true", help="apply: drop and recreate indexes whose options changed")
+    parser.add_argument("--drop-extra", action="store_true", help="apply: drop indexes that are not in the registry")
+    parser.add_argument("--enable-profiler", action="store_true", help="slow-queries: turn on the profiler first")
+    parser.add_argument("--slowms", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    try:
+        await COMMANDS[args.command](args)
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+"""One-off data migrations for the Edu Dham database.
+
+Usage:
+    python backend/migrate.py derived-fields
+    python backend/migrate.py media
+    python backend/migrate.py media-variants
+    python backend/migrate.py application-counters
+    python backend/migrate.py datetimes
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from pymongo import UpdateOne
+
+from server import (
+    bump_collection_versions, client, db, drain_background_tasks, ensure_indexes,
+    externalize_photo, externalize_university_photos, generate_image_variants,
+    media_bucket, reconcile_application_counters, university_derived_fields,
+)
+
+BATCH_SIZE = 500
+
+async def backfill_derived_fields():
+    """Recompute the stored derived fields (search terms, fee summary) for every university."""
+    await ensure_indexes(["universities"])
+    updated = 0
+    batch = []
+    async for uni in db.universities.find({}, {"search_terms": 0}):
+        batch.append(UpdateOne({"_id": uni["_id"]}, {"$set": university_derived_fields(uni)}))
+        if len(batch) >= BATCH_SIZE:
+            await db.universities.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await db.universities.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    await bump_collection_versions("universities")
+    print(f"Updated derived fields on {updated} universities")
+
+async def migrate_inline_photos():
+    """Move base64 data URLs on universities and the homepage config into the media store.
+
+    Values that are not a JPEG, PNG, WebP or GIF image are reported and left inline.
+    """
+    inline = {"$regex": "^data:"}
+    migrated = 0
+    async for uni in db.universities.find(
+        {"$or": [{"main_photo": inline}, {"photo_gallery": inline}]},
+        {"_id": 1, "main_photo": 1, "photo_gallery": 1}
+    ):
+        try:
+            photos = await externalize_university_photos(
+                {"main_photo": uni.get("main_photo"), "photo_gallery": uni.get("photo_gallery") or []}
+            )
+        except HTTPException as e:
+            print(f"  university {uni['_id']}: {e.detail}")
+            continue
+        await db.universities.update_one({"_id": uni["_id"]}, {"$set": photos})
+        migrated += 1
+    await bump_collection_versions("universities")
+    print(f"Moved inline photos of {migrated} universities to the media store")
+
+    config = await db.homepage_config.find_one({"_id": "singleton"})
+    if config:
+        update = {}
+        try:
+            if config.get("logo_url"):
+                update["logo_url"] = await externalize_photo(config["logo_url"])
+            if config.get("background_images"):
+                update["background_images"] = [await externalize_photo(u) for u in config["background_images"]]
+        except HTTPException as e:
+            print(f"  homepage config: {e.detail}")
+            update = {}
+        if update:
+            await db.homepage_config.update_one({"_id": "singleton"}, {"$set": update})
+            await bump_collection_versions("homepage_config")
+            print("Moved inline homepage images to the media store")
+    await drain_background_tasks()
+
+async def tag_variants():
+    """Mark derivatives stored before they recorded `variant_of`, so they are not resized again."""
+    tagged = 0
+    async for media in db.media.files.find({"metadata.variants": {"$exists": True}}, {"metadata.variants": 1}):
+        digests = [d for formats in media["metadata"]["variants"].values() for d in formats.values()]
+        result = await db.media.files.update_many(
+            {"_id": {"$in": digests}, "metadata.variant_of": {"$exists": False}},
+            {"$set": {"metadata.variant_of": media["_id"]}}
+        )
+        tagged += result.modified_count
+    if tagged:
+        print(f"Tagged {tagged} existing derivatives")
+
+async def generate_missing_variants():
+    """Generate resized derivatives for stored images that do not have them yet."""
+    await tag_variants()
+    # Collected up front: the derivatives written below must not show up in the scan
+    pending = await db.media.files.find(
+        {
+            "metadata.content_type": {"$regex": "^image/"},
+            "metadata.variants": {"$exists": False},
+            "metadata.variant_of": {"$exists": False},
+        },
+        {"_id": 1}
+    ).to_list(None)
+    generated = 0
+    for media in pending:
+        stream = await media_bucket().open_download_stream(media["_id"])
+        await generate_image_variants(media["_id"], await stream.read())
+        generated += 1
+    print(f"Generated variants for {generated} images")
+
+async def recount_application_counters():
+    """Rebuild the per-university application counters from the applications."""
+    universities = await reconcile_application_counters()
+    print(f"Recounted application counters for {universities} universities")
+
+# Timestamp fields that used to be stored as ISO strings, per collection
+DATETIME_FIELDS = {
+    "users": ("created_at",),
+    "universities": ("created_at",),
+    "applications": ("created_at",),
+    "categories": ("created_at",),
+    "homepage_config": ("updated_at",),
+    "otps": ("created_at", "expires_at"),
+    "import_jobs": ("created_at", "heartbeat_at", "finished_at"),
+}
+
+def parse_timestamp(value: str) -> datetime:
+    """ISO string -> UTC datetime; "Z" suffixes (seed data) and naive values are UTC."""
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed.astimezone(timezone.utc)
+
+async def convert_datetimes():
+    """Convert string timestamps to BSON dates in batches.
+
+    Only documents that still hold a string are selected, so an interrupted
+    run picks up where it stopped when started again. Unparseable values are
+    reported and left as they are.
+    """
+    for collection, fields in DATETIME_FIELDS.items():
+        converted = 0
+        invalid = 0
+        batch = []
+        async for doc in db[collection].find(
+            {"$or": [{field: {"$type": "string"}} for field in fields]},
+            {field: 1 for field in fields}
+        ):
+            update = {}
+            for field in fields:
+                if isinstance(doc.get(field), str):
+                    try:
+                        update[field] = parse_timestamp(doc[field])
+                    except ValueError:
+                        invalid += 1
+                        print(f"  {collection} {doc['_id']}: cannot parse {field}={doc[field]!r}")
+            if update:
+                batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+            if len(batch) >= BATCH_SIZE:
+                await db[collection].bulk_write(batch, ordered=False)
+                converted += len(batch)
+                batch = []
+        if batch:
+            await db[collection].bulk_write(batch, ordered=False)
+            converted += len(batch)
+        print(f"Converted timestamps on {converted} {collection} documents" + (f" ({invalid} unparseable)" if invalid else ""))
+    await bump_collection_versions("universities", "categories", "homepage_config")
+
+MIGRATIONS = {
+    "derived-fields": backfill_derived_fields,
+    "media": migrate_inline_photos,
+    "media-variants": generate_missing_variants,
+    "application-counters": recount_application_counters,
+    "datetimes": convert_datetimes,
+}
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run Edu Dham data migrations")
+    parser.add_argument("migration", choices=sorted(MIGRATIONS))
+    args = parser.parse_args()
+    try:
+        await MIGRATIONS[args.migration]()
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
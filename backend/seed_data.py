@@ -1,9 +1,11 @@
 import asyncio
 import os
+from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 import bcrypt
 from pathlib import Path
+from server import university_derived_fields
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -44,7 +46,7 @@ async def seed_database():
         "name": "Admin User",
         "role": "admin",
         "university_id": None,
-        "created_at": "2024-01-15T10:00:00Z"
+        "created_at": datetime(2024, 1, 15, 10, 0, tzinfo=timezone.utc)
     }
     await db.users.insert_one(admin)
     print("Created admin user: admin@edudham.com / admin123")
@@ -76,7 +78,7 @@ async def seed_database():
                 "email": "info@lkouniv.ac.in",
                 "website": "https://www.lkouniv.ac.in"
             },
-            "created_at": "2024-01-10T10:00:00Z"
+            "created_at": datetime(2024, 1, 10, 10, 0, tzinfo=timezone.utc)
         },
         {
             "id": "uni-002",
@@ -101,7 +103,7 @@ async def seed_database():
                 "email": "admission@iul.ac.in",
                 "website": "https://www.iul.ac.in"
             },
-            "created_at": "2024-01-10T10:00:00Z"
+            "created_at": datetime(2024, 1, 10, 10, 0, tzinfo=timezone.utc)
         },
         {
             "id": "uni-003",
@@ -126,7 +128,7 @@ async def seed_database():
                 "email": "registrar@amu.ac.in",
                 "website": "https://www.amu.ac.in"
             },
-            "created_at": "2024-01-10T10:00:00Z"
+            "created_at": datetime(2024, 1, 10, 10, 0, tzinfo=timezone.utc)
         },
         {
             "id": "uni-004",
@@ -151,7 +153,7 @@ async def seed_database():
                 "email": "registrar@bhu.ac.in",
                 "website": "https://www.bhu.ac.in"
             },
-            "created_at": "2024-01-10T10:00:00Z"
+            "created_at": datetime(2024, 1, 10, 10, 0, tzinfo=timezone.utc)
         },
         {
             "id": "uni-005",
@@ -176,7 +178,7 @@ async def seed_database():
                 "email": "admissions@iitk.ac.in",
                 "website": "https://www.iitk.ac.in"
             },
-            "created_at": "2024-01-10T10:00:00Z"
+            "created_at": datetime(2024, 1, 10, 10, 0, tzinfo=timezone.utc)
         },
         {
             "id": "uni-006",
@@ -201,10 +203,12 @@ async def seed_database():
                 "email": "admissions@amity.edu",
                 "website": "https://www.amity.edu"
             },
-            "created_at": "2024-01-10T10:00:00Z"
+            "created_at": datetime(2024, 1, 10, 10, 0, tzinfo=timezone.utc)
         }
     ]
     
+    for uni in universities:
+        uni.update(university_derived_fields(uni))
     await db.universities.insert_many(universities)
     print(f"Created {len(universities)} universities")
     
@@ -216,7 +220,7 @@ async def seed_database():
         "name": "Integral Manager",
         "role": "manager",
         "university_id": "uni-002",
-        "created_at": "2024-01-15T10:00:00Z"
+        "created_at": datetime(2024, 1, 15, 10, 0, tzinfo=timezone.utc)
     }
     await db.users.insert_one(manager)
     print("Created manager user: manager@integral.edu / manager123 (assigned to Integral University)")
@@ -233,7 +237,7 @@ async def seed_database():
             "course_interest": "B.Tech Computer Science",
             "short_note": "I am very interested in pursuing computer science at your esteemed university.",
             "status": "pending",
-            "created_at": "2024-01-20T14:30:00Z"
+            "created_at": datetime(2024, 1, 20, 14, 30, tzinfo=timezone.utc)
         },
         {
             "id": "app-002",
@@ -245,7 +249,7 @@ async def seed_database():
             "course_interest": "MBA",
             "short_note": "Looking forward to joining your MBA program to enhance my business skills.",
             "status": "pending",
-            "created_at": "2024-01-21T10:15:00Z"
+            "created_at": datetime(2024, 1, 21, 10, 15, tzinfo=timezone.utc)
         },
         {
             "id": "app-003",
@@ -257,7 +261,7 @@ async def seed_database():
             "course_interest": "B.A. English",
             "short_note": "Passionate about literature and would love to study at your university.",
             "status": "pending",
-            "created_at": "2024-01-22T09:00:00Z"
+            "created_at": datetime(2024, 1, 22, 9, 0, tzinfo=timezone.utc)
         }
     ]
     
@@ -1,33 +1,198 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Query, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, InsertOne, ReadPreference, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo import monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+from gridfs.errors import NoFile
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationError, computed_field
+from typing import List, Optional, Dict, Any, Union
 import uuid
 from datetime import datetime, timezone, timedelta
 import jwt
 import bcrypt
 import random
+import re
 import string
+import tempfile
+import time
+from collections import OrderedDict
 from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, Alignment, PatternFill
 from io import BytesIO
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import base64
+import csv
+import io
+import hashlib
+import hmac
+import json
+import math
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters for this process, served by GET /api/metrics.
+
+    pymongo reports checkouts from Motor's worker threads, so the checkout
+    start time is kept per thread.
+    """
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_seconds = 0.0
+        self.pool_clears = 0
+        self._lock = threading.Lock()
+        self._started = threading.local()
+
+    def _update(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def connection_check_out_started(self, event):
+        self._started.at = time.monotonic()
+        self._update(waiting=1)
+
+    def connection_checked_out(self, event):
+        waited = time.monotonic() - getattr(self._started, 'at', time.monotonic())
+        self._update(waiting=-1, checked_out=1, checkouts=1, checkout_wait_seconds=waited)
+
+    def connection_check_out_failed(self, event):
+        self._update(waiting=-1, checkout_failures=1)
+
+    def connection_checked_in(self, event):
+        self._update(checked_out=-1)
+
+    def connection_created(self, event):
+        self._update(open=1)
+
+    def connection_closed(self, event):
+        self._update(open=-1)
+
+    def pool_cleared(self, event):
+        self._update(pool_clears=1)
+
+    # Required by the listener interface; nothing to count
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+# MongoDB connection. Unset settings keep the driver defaults (or whatever the
+# URL's query string says).
+MONGO_CLIENT_SETTINGS = {
+    "maxPoolSize": ('MONGO_MAX_POOL_SIZE', int),
+    "minPoolSize": ('MONGO_MIN_POOL_SIZE', int),
+    "maxIdleTimeMS": ('MONGO_MAX_IDLE_TIME_MS', int),
+    "maxConnecting": ('MONGO_MAX_CONNECTING', int),
+    "waitQueueTimeoutMS": ('MONGO_WAIT_QUEUE_TIMEOUT_MS', int),
+    "serverSelectionTimeoutMS": ('MONGO_SERVER_SELECTION_TIMEOUT_MS', int),
+    "connectTimeoutMS": ('MONGO_CONNECT_TIMEOUT_MS', int),
+    "socketTimeoutMS": ('MONGO_SOCKET_TIMEOUT_MS', int),
+    "compressors": ('MONGO_COMPRESSORS', str),  # e.g. "zstd,snappy,zlib" (zstandard, python-snappy)
+}
+
+def mongo_client_options() -> Dict[str, Any]:
+    options = {}
+    for option, (env_name, cast) in MONGO_CLIENT_SETTINGS.items():
+        value = os.environ.get(env_name)
+        if value:
+            options[option] = cast(value)
+    return options
+
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+pool_metrics = PoolMetrics()
+# tz_aware: stored datetimes come back as UTC-aware, comparable with datetime.now(timezone.utc).
+# connect=False: no connections until first use, so a preloaded app (gunicorn
+# preload_app) forks workers before any sockets or monitor threads exist.
+client = AsyncIOMotorClient(
+    mongo_url, tz_aware=True, connect=False, event_listeners=[pool_metrics], **mongo_client_options()
+)
 db = client[os.environ['DB_NAME']]
 
+# Public catalog reads (universities, categories, homepage config and their
+# versions) can go to secondaries with MONGO_CATALOG_READ_PREFERENCE, e.g.
+# "secondaryPreferred". They then lag writes by the replication delay, bounded
+# by MONGO_CATALOG_MAX_STALENESS_SECONDS (at least 90) if set; see
+# CATALOG_ETAG_ROTATION_SECONDS for what that means for ETags.
+catalog_db = client.get_database(
+    os.environ['DB_NAME'],
+    read_preference=make_read_preference(
+        read_pref_mode_from_name(os.environ.get('MONGO_CATALOG_READ_PREFERENCE', 'primary')),
+        None,
+        int(os.environ.get('MONGO_CATALOG_MAX_STALENESS_SECONDS', '-1')),
+    ),
+)
+
+# GridFS buckets bind to the event loop when created, so they are made on first
+# use rather than at import (scripts importing this module run under asyncio.run)
+_gridfs_buckets: Dict[str, AsyncIOMotorGridFSBucket] = {}
+
+def gridfs_bucket(name: str) -> AsyncIOMotorGridFSBucket:
+    if name not in _gridfs_buckets:
+        _gridfs_buckets[name] = AsyncIOMotorGridFSBucket(db, bucket_name=name)
+    return _gridfs_buckets[name]
+
+def media_bucket() -> AsyncIOMotorGridFSBucket:
+    """Uploaded images, keyed by their SHA-256."""
+    return gridfs_bucket("media")
+
+MEDIA_URL_PREFIX = os.environ.get('MEDIA_URL_PREFIX', '/api/media').rstrip('/')
+MAX_PHOTO_BYTES = 5 * 1024 * 1024
+MEDIA_STREAM_CHUNK = 256 * 1024
+# Media is served from the app's own origin, so only raster formats are stored,
+# under the type Pillow detects rather than the one the client claimed
+# (text/html or image/svg+xml would run script for anyone opening the URL)
+MEDIA_IMAGE_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp", "GIF": "image/gif"}
+MEDIA_SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "Content-Security-Policy": "sandbox",
+}
+
+# Resized derivatives generated for every uploaded image: name -> bounding box
+IMAGE_VARIANTS = {
+    "thumb": (480, 480),
+    "card": (640, 480),
+    "hero": (1600, 1000),
+}
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+image_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
+
+# bcrypt releases the GIL, so hashing runs on its own small pool: the event
+# loop stays free and at most PASSWORD_HASH_WORKERS hashes run per process.
+# Raising BCRYPT_ROUNDS rehashes each password at its owner's next login.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
 # JWT Settings
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
@@ -52,7 +217,7 @@ class Category(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class CategoryCreate(BaseModel):
     name: str
@@ -69,7 +234,7 @@ class User(BaseModel):
     name: str
     role: str  # 'admin', 'manager', 'student'
     university_id: Optional[str] = None
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -89,6 +254,16 @@ class UserResponse(BaseModel):
     role: str
     university_id: Optional[str] = None
 
+class Principal(BaseModel):
+    """The user a verified token was issued to, as claimed by the token."""
+    model_config = ConfigDict(frozen=True)
+    user_id: str
+    email: str
+    role: str
+    university_id: Optional[str] = None
+    issued_at: float = 0  # tokens issued before `iat` was added count as issued at 0
+    expires_at: float
+
 class OTPRequest(BaseModel):
     email: EmailStr
 
@@ -101,8 +276,9 @@ class OTP(BaseModel):
     model_config = ConfigDict(extra="ignore")
     email: str
     otp: str
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
-    expires_at: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    expires_at: datetime  # BSON date, so the TTL index removes the OTP once it expires
+    attempts: int = 0
 
 class HomepageConfig(BaseModel):
     hero_title: str = "Find Your Perfect"
@@ -125,7 +301,7 @@ class HomepageConfig(BaseModel):
     hero_subtitle_color: str = "#cbd5e1"
     # Footer
     show_footer: bool = False
-    updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class FeeStructure(BaseModel):
     course: str
@@ -146,7 +322,7 @@ class University(BaseModel):
     location: str
     state: Optional[str] = ""
     university_categories: List[str] = []  # e.g., ["Engineering", "Medical"]
-    main_photo: Optional[str] = ""  # Now stores base64 or URL or empty for placeholder
+    main_photo: Optional[str] = ""  # Media URL (/api/media/<sha256>), external URL or empty for placeholder
     photo_gallery: List[str] = []
     description: str
     courses: List[Course] = []
@@ -154,7 +330,12 @@ class University(BaseModel):
     rating: float = 0.0
     tags: List[str] = []
     contact_details: Dict[str, str] = {}
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @computed_field
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        return media_variant_url(self.main_photo, "thumb")
 
 class UniversityCreate(BaseModel):
     name: str
@@ -184,6 +365,11 @@ class UniversityUpdate(BaseModel):
     tags: Optional[List[str]] = None
     contact_details: Optional[Dict[str, str]] = None
 
+class UniversityPage(BaseModel):
+    items: List[University]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
 class Application(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -195,7 +381,7 @@ class Application(BaseModel):
     course_interest: str
     short_note: str
     status: str = 'pending'  # pending, contacted, accepted, rejected
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ApplicationCreate(BaseModel):
     university_id: str
@@ -216,22 +402,49 @@ class ApplicationResponse(BaseModel):
     course_interest: str
     short_note: str
     status: str
-    created_at: str
+    created_at: datetime
+
+class ApplicationPage(BaseModel):
+    items: List[ApplicationResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
 
 # ============ UTILITY FUNCTIONS ============
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def _hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
 
-def verify_password(password: str, hashed: str) -> bool:
+def _verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(password_executor, _hash_password, password)
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(password_executor, _verify_password, password, hashed)
+
+def password_needs_rehash(hashed: str) -> bool:
+    """True if the hash was made with a cost other than BCRYPT_ROUNDS ("$2b$<cost>$...")."""
+    try:
+        return int(hashed.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+async def rehash_password(user_id: str, password: str, old_hash: str):
+    try:
+        new_hash = await hash_password(password)
+        # Only replace the hash that was verified, in case the password changed meanwhile
+        await db.users.update_one({"id": user_id, "password_hash": old_hash}, {"$set": {"password_hash": new_hash}})
+    except Exception:
+        logger.exception(f"Could not rehash the password of user {user_id}")
+
 def create_token(user_id: str, email: str, role: str, university_id: Optional[str] = None) -> str:
     payload = {
         'user_id': user_id,
         'email': email,
         'role': role,
         'university_id': university_id,
+        'iat': datetime.now(timezone.utc),
         'exp': datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
@@ -244,13 +457,557 @@ def decode_token(token: str) -> Dict:
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict:
-    token = credentials.credentials
-    return decode_token(token)
+OTP_TTL_MINUTES = 10
+# Tries per OTP: the correct code is accepted on any of the first
+# OTP_MAX_ATTEMPTS tries, and the last wrong one deletes the OTP
+OTP_MAX_ATTEMPTS = 5
 
 def generate_otp() -> str:
     return ''.join(random.choices(string.digits, k=6))
 
+# ============ PAGINATION ============
+
+MAX_PAGE_SIZE = 100
+MAX_UNPAGED_UNIVERSITIES = 1000
+
+# Datetime sort values round-trip through cursors as {"$date": iso}
+def _cursor_default(value):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+def _cursor_object_hook(obj: Dict):
+    if obj.keys() == {"$date"}:
+        if not isinstance(obj["$date"], str):
+            raise ValueError("$date must be a string")
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+def encode_cursor(data: Dict) -> str:
+    raw = json.dumps(data, separators=(',', ':'), default=_cursor_default).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Dict:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')), object_hook=_cursor_object_hook)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return data
+
+# Cursor values end up in the query, so anything that could be read as an
+# operator ({"$ne": null}, lists) is refused
+CURSOR_VALUE_TYPES = (str, int, float, bool, datetime, type(None))
+
+def keyset_filter(field: str, value: Any, last_id: str, descending: bool) -> Dict:
+    """Match documents strictly after (value, last_id) in a (field, id) ordering."""
+    if not isinstance(value, CURSOR_VALUE_TYPES) or not isinstance(last_id, str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    op = '$lt' if descending else '$gt'
+    return {'$or': [
+        {field: {op: value}},
+        {field: value, 'id': {op: last_id}},
+    ]}
+
+# ============ UNIVERSITY SEARCH ============
+
+# Relative weights of the fields covered by the universities text index.
+# `search_terms` holds the normalized abbreviations and prefixes built below.
+SEARCH_INDEX_NAME = "universities_text_search"
+SEARCH_FIELD_WEIGHTS = {
+    "name": 10,
+    "university_categories": 6,
+    "courses.course_name": 6,
+    "tags": 5,
+    "courses.category": 4,
+    "location": 4,
+    "state": 3,
+    "search_terms": 2,
+    "description": 1,
+}
+SEARCH_MIN_PREFIX = 3
+
+# Dotted abbreviations: letters joined by dots ("B.Tech", "Ph.D", "M.B.A."),
+# spaced single-letter initials ("C. S. J. M.") and one spaced initial before a
+# word ("B. Tech"). They are indexed both collapsed ("btech", "csjm") and as
+# their separate parts, but searched only collapsed: the parts ("b", "tech")
+# would match nearly every university.
+_DOTTED_ABBREVIATION_RE = re.compile(
+    r"\b[a-z]+(?:\.[a-z]+)+\b\.?"
+    r"|\b(?:[a-z]\.\s?){2,}(?![a-z])"
+    r"|\b[a-z]\.\s[a-z]+\b"
+)
+_SEARCH_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize_search_text(text: str) -> List[str]:
+    """Lower-case word tokens, plus the collapsed form of dotted abbreviations."""
+    text = (text or "").lower()
+    tokens = [re.sub(r"[^a-z]", "", match.group()) for match in _DOTTED_ABBREVIATION_RE.finditer(text)]
+    tokens += _SEARCH_TOKEN_RE.findall(text)
+    return list(dict.fromkeys(tokens))
+
+def build_search_terms(doc: Dict) -> str:
+    """Build the `search_terms` value stored on a university document.
+
+    Short fields contribute their collapsed tokens plus every prefix of at least
+    SEARCH_MIN_PREFIX characters, so partially typed queries ("luckn", "btec")
+    still hit the text index.
+    """
+    values = [doc.get('name'), doc.get('location'), doc.get('state')]
+    values += doc.get('university_categories') or []
+    values += doc.get('tags') or []
+    values += doc.get('courses_offered') or []
+    for course in doc.get('courses') or []:
+        if isinstance(course, dict):
+            values += [course.get('course_name'), course.get('category')]
+
+    terms = set()
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        for token in tokenize_search_text(value):
+            terms.add(token)
+            for end in range(SEARCH_MIN_PREFIX, len(token)):
+                terms.add(token[:end])
+    return " ".join(sorted(terms))
+
+def tokenize_search_query(search: str) -> List[str]:
+    """Query tokens: dotted abbreviations collapsed, other words as they are."""
+    text = _DOTTED_ABBREVIATION_RE.sub(lambda match: f" {re.sub(r'[^a-z]', '', match.group())} ", (search or "").lower())
+    return list(dict.fromkeys(_SEARCH_TOKEN_RE.findall(text)))
+
+def normalize_search_query(search: str) -> str:
+    """Turn free user input into a safe `$text` search string.
+
+    Each token is quoted: `$text` ORs bare terms but requires every phrase, so
+    all words of the query must match, as with the old substring search.
+    """
+    return " ".join(f'"{token}"' for token in tokenize_search_query(search))
+
+def fee_summary(doc: Dict) -> Dict:
+    """Average, lowest and highest annual fee across a university's courses.
+
+    Reads `courses[].fees` and the legacy `fee_structure[].annual_fee`; a fee of
+    0 means "not provided" (bulk uploads) and is skipped. All three values are
+    None when no fee is known.
+    """
+    fees = []
+    for course in doc.get('courses') or []:
+        if isinstance(course, dict) and isinstance(course.get('fees'), (int, float)) and course['fees'] > 0:
+            fees.append(float(course['fees']))
+    for entry in doc.get('fee_structure') or []:
+        if isinstance(entry, dict) and isinstance(entry.get('annual_fee'), (int, float)) and entry['annual_fee'] > 0:
+            fees.append(float(entry['annual_fee']))
+    if not fees:
+        return {"avg_fee": None, "min_fee": None, "max_fee": None}
+    return {"avg_fee": sum(fees) / len(fees), "min_fee": min(fees), "max_fee": max(fees)}
+
+# Fields university_derived_fields reads
+DERIVED_SOURCE_FIELDS = (
+    'name', 'location', 'state', 'university_categories', 'tags', 'courses_offered', 'courses', 'fee_structure',
+)
+
+def university_derived_fields(doc: Dict) -> Dict:
+    """Fields computed from a university document and stored alongside it."""
+    return {"search_terms": build_search_terms(doc), **fee_summary(doc)}
+
+# Sort keys accepted by the paged university listing; each gets a (key, id) index
+UNIVERSITY_SORT_FIELDS = ('rating', 'placement_percentage', 'name', 'created_at')
+
+SEARCH_INDEX = IndexModel(
+    [(field, TEXT) for field in SEARCH_FIELD_WEIGHTS],
+    weights=SEARCH_FIELD_WEIGHTS,
+    name=SEARCH_INDEX_NAME,
+    default_language="english",
+)
+
+async def ensure_search_index(collection=None):
+    collection = db.universities if collection is None else collection
+    await collection.create_indexes([SEARCH_INDEX])
+
+# ============ INDEXES ============
+
+# Every index the queries in this module rely on, per collection. Indexes use
+# MongoDB's generated names (e.g. "university_id_1_created_at_-1") unless they
+# need one, so the registry can be diffed against index_information() by name.
+# `python backend/indexes.py` diffs and applies it by hand.
+def _unique_id_index() -> IndexModel:
+    return IndexModel([("id", ASCENDING)], unique=True)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        _unique_id_index(),
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("role", ASCENDING)]),
+    ],
+    "universities": [
+        _unique_id_index(),
+        # The (name, id) sort index also serves the name lookups of bulk upserts
+        *(IndexModel([(field, DESCENDING), ("id", DESCENDING)]) for field in UNIVERSITY_SORT_FIELDS),
+        IndexModel([("avg_fee", ASCENDING)]),
+        SEARCH_INDEX,
+    ],
+    "applications": [
+        _unique_id_index(),
+        IndexModel([("university_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("created_at", DESCENDING)]),
+    ],
+    "otps": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        # Mongo only expires documents whose expires_at is a BSON date
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "categories": [
+        _unique_id_index(),
+    ],
+    "rate_limits": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "token_revocations": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "import_jobs": [
+        _unique_id_index(),
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)]),
+    ],
+}
+
+# Options that make two indexes on the same key different
+INDEX_OPTIONS = ('unique', 'expireAfterSeconds', 'weights')
+
+async def index_diff(collections=None, database=None) -> Dict[str, Dict[str, List]]:
+    """Compare the registry with the database.
+
+    Returns {collection: {"missing": [IndexModel], "changed": [IndexModel],
+    "extra": [index name]}}, where "changed" indexes exist under the same name
+    with different options.
+    """
+    database = db if database is None else database
+    diff = {}
+    for name in collections or INDEXES:
+        existing = await database[name].index_information()
+        wanted = {model.document['name']: model for model in INDEXES[name]}
+        changed = []
+        for index_name, model in wanted.items():
+            info = existing.get(index_name)
+            if info is not None and any(
+                model.document.get(option) != info.get(option) for option in INDEX_OPTIONS
+            ):
+                changed.append(model)
+        diff[name] = {
+            "missing": [model for index_name, model in wanted.items() if index_name not in existing],
+            "changed": changed,
+            "extra": [index_name for index_name in existing if index_name != '_id_' and index_name not in wanted],
+        }
+    return diff
+
+async def ensure_indexes(collections=None, database=None):
+    """Create the registry indexes that do not exist yet.
+
+    Changed and extra indexes are only reported; rebuilding them is left to
+    the CLI. A failing index (e.g. duplicates under a unique key) is logged
+    so it does not keep the server from starting.
+    """
+    database = db if database is None else database
+    for name, changes in (await index_diff(collections, database)).items():
+        for model in changes['missing']:
+            try:
+                await database[name].create_indexes([model])
+                logger.info(f"Created index {name}.{model.document['name']}")
+            except OperationFailure as e:
+                logger.error(f"Could not create index {name}.{model.document['name']}: {e}")
+        for model in changes['changed']:
+            logger.warning(f"Index {name}.{model.document['name']} differs from the registry; run backend/indexes.py apply --rebuild")
+
+# ============ RESPONSE CACHE ============
+
+_MISSING = object()
+
+class TTLCache:
+    """Small in-process LRU cache with a per-entry time to live.
+
+    Each server worker has its own copy. Writers call `invalidate`, which only
+    reaches their own worker, so the TTL bounds how long other workers can
+    serve a stale value.
+    """
+
+    def __init__(self, maxsize: int = 256, default_ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        expires = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+HOMEPAGE_CONFIG_CACHE_KEY = "homepage_config"
+FILTER_OPTIONS_CACHE_KEY = "university_filter_options"
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', '300'))
+response_cache = TTLCache(maxsize=int(os.environ.get('CACHE_MAX_ENTRIES', '256')), default_ttl=CACHE_TTL_SECONDS)
+
+async def cached(key, loader, collections=(), ttl: Optional[float] = None):
+    """Return the cached value for `key`, calling `loader()` on a miss.
+
+    A value loaded from `collections` is cached per version of them, the same
+    versions conditional_get builds the ETag from. A write handled by any
+    worker therefore moves every worker to a fresh body along with the new
+    ETag, instead of serving a body from before the write under it.
+    """
+    if collections:
+        versions = await get_collection_versions(collections)
+        key = (key, *(versions[name] for name in collections))
+        if CATALOG_ETAG_ROTATION_SECONDS:
+            ttl = min(CACHE_TTL_SECONDS if ttl is None else ttl, CATALOG_ETAG_ROTATION_SECONDS)
+    value = response_cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = await loader()
+        response_cache.set(key, value, ttl)
+    return value
+
+# ============ AUTHENTICATION ============
+
+# Verified tokens are cached per worker by SHA-256, for PRINCIPAL_CACHE_TTL_SECONDS
+# or until the token expires, so repeat requests skip signature checks and
+# parsing. Changing or deleting a user records a revocation in
+# `token_revocations`: tokens issued before it are refused. This worker drops
+# them at once; other workers once their cached entry expires.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '60'))
+principal_cache = TTLCache(maxsize=int(os.environ.get('PRINCIPAL_CACHE_MAX_ENTRIES', '1024')), default_ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+_local_revocations: Dict[str, float] = {}
+
+def token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+async def authenticate(token: str) -> Principal:
+    key = token_cache_key(token)
+    principal = principal_cache.get(key)
+    if principal is None:
+        payload = decode_token(token)
+        try:
+            principal = Principal(
+                user_id=payload['user_id'],
+                email=payload['email'],
+                role=payload['role'],
+                university_id=payload.get('university_id'),
+                issued_at=payload.get('iat', 0),
+                expires_at=payload['exp'],
+            )
+        except (KeyError, ValidationError):
+            raise HTTPException(status_code=401, detail="Invalid token")
+        revocation = await db.token_revocations.find_one({"_id": principal.user_id}, {"_id": 0, "revoked_at": 1})
+        if revocation:
+            _local_revocations[principal.user_id] = revocation['revoked_at']
+        ttl = min(PRINCIPAL_CACHE_TTL_SECONDS, principal.expires_at - time.time())
+        if ttl > 0:
+            principal_cache.set(key, principal, ttl)
+    if principal.issued_at < _local_revocations.get(principal.user_id, 0):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    if principal.expires_at <= time.time():
+        raise HTTPException(status_code=401, detail="Token expired")
+    return principal
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
+    return await authenticate(credentials.credentials)
+
+async def revoke_user_tokens(user_id: str):
+    """Refuse every token issued to the user so far; call when the user changes or is deleted."""
+    # Whole seconds, like `iat`, so a token issued right after this is accepted
+    now = int(time.time())
+    _local_revocations[user_id] = now
+    await db.token_revocations.update_one(
+        {"_id": user_id},
+        # The record only matters until the last token issued before it expires
+        {"$set": {"revoked_at": now, "expires_at": datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)}},
+        upsert=True
+    )
+
+# ============ RATE LIMITING ============
+
+# Per-route limits on the unauthenticated write endpoints: (key, capacity,
+# period in seconds), where the key is the client IP or the email in the
+# body. Limits are checked before any database or hashing work.
+RATE_LIMITS = {
+    "register": (("ip", 10, 3600),),
+    "login": (("ip", 30, 60), ("email", 10, 300)),
+    "request_otp": (("ip", 10, 600), ("email", 3, 600)),
+    "create_application": (("ip", 20, 600), ("email", 5, 600)),
+}
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+# Reverse proxies in front of the app that append the address they saw to
+# X-Forwarded-For (1 behind Railway's edge). The client is the entry that many
+# hops from the right; anything further left came from the client itself.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+
+def client_ip(request: Request) -> str:
+    if TRUSTED_PROXY_HOPS:
+        hops = [hop.strip() for hop in request.headers.get('x-forwarded-for', '').split(',') if hop.strip()]
+        if len(hops) >= TRUSTED_PROXY_HOPS:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+class MemoryRateLimitStore:
+    """Token buckets in this process. Each worker limits on its own, so the
+    effective limit is the configured one times the number of workers."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def take(self, key: str, capacity: int, period: float) -> float:
+        """Take one token; return 0 if there was one, else seconds until there is."""
+        now = time.monotonic()
+        rate = capacity / period
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+class MongoRateLimitStore:
+    """Fixed-window counters in `rate_limits`, shared by every worker and host.
+    Costs one small write per check; old windows expire through a TTL index."""
+
+    async def take(self, key: str, capacity: int, period: float) -> float:
+        now = time.time()
+        window_end = (math.floor(now / period) + 1) * period
+        counter = await db.rate_limits.find_one_and_update(
+            {"_id": f"{key}:{window_end:.0f}"},
+            {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": datetime.fromtimestamp(window_end, timezone.utc)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return 0.0 if counter['count'] <= capacity else window_end - now
+
+RATE_LIMIT_STORES = {
+    "memory": MemoryRateLimitStore,
+    "mongo": MongoRateLimitStore,
+}
+rate_limit_store = RATE_LIMIT_STORES[os.environ.get('RATE_LIMIT_BACKEND', 'memory')]()
+
+async def enforce_rate_limit(route: str, request: Request, email: Optional[str] = None):
+    """Raise 429 with Retry-After if the client is over any limit for `route`."""
+    if not RATE_LIMIT_ENABLED:
+        return
+    identities = {"ip": client_ip(request), "email": (email or "").lower()}
+    for kind, capacity, period in RATE_LIMITS[route]:
+        if not identities[kind]:
+            continue
+        wait = await rate_limit_store.take(f"{route}:{kind}:{identities[kind]}", capacity, period)
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+# ============ CHANGE TRACKING ============
+
+# Every write to a public collection bumps its counter in `collection_versions`;
+# conditional GETs derive their ETag from these counters instead of the body.
+VERSION_CACHE_TTL_SECONDS = float(os.environ.get('VERSION_CACHE_TTL_SECONDS', '2'))
+
+# When catalog reads go to secondaries, the versions and a body can come from
+# different members, so a body may still miss the write its ETag names. ETags
+# and cached bodies then turn over every CATALOG_ETAG_ROTATION_SECONDS (the
+# max staleness, at least 90), which bounds how long such a body is kept.
+CATALOG_ETAG_ROTATION_SECONDS = (
+    0 if catalog_db.read_preference.mode == ReadPreference.PRIMARY.mode
+    else max(catalog_db.read_preference.max_staleness, 90)
+)
+
+async def get_collection_versions(names, database=None) -> Dict[str, int]:
+    """Current version per name; read like the catalog unless `database` is given."""
+    database = catalog_db if database is None else database
+    versions = {}
+    missing = []
+    for name in names:
+        version = response_cache.get(f"version:{name}", _MISSING)
+        if version is _MISSING:
+            missing.append(name)
+        else:
+            versions[name] = version
+    if missing:
+        async for doc in database.collection_versions.find({"_id": {"$in": missing}}):
+            versions[doc['_id']] = doc.get('version', 0)
+        for name in missing:
+            versions.setdefault(name, 0)
+            response_cache.set(f"version:{name}", versions[name], VERSION_CACHE_TTL_SECONDS)
+    return versions
+
+async def bump_collection_versions(*names):
+    response_cache.invalidate(*(f"version:{name}" for name in names))
+    await asyncio.gather(*(
+        db.collection_versions.update_one({"_id": name}, {"$inc": {"version": 1}}, upsert=True)
+        for name in names
+    ))
+
+# Cached responses are keyed by these versions, so bumping them is all the
+# invalidation they need
+async def universities_changed():
+    """Call after any write to universities."""
+    await bump_collection_versions("universities")
+
+async def categories_changed():
+    """Call after any write to categories."""
+    await bump_collection_versions("categories")
+
+async def homepage_config_changed():
+    await bump_collection_versions("homepage_config")
+
+async def applications_changed(university_id: str, status_counts: Dict[str, int]):
+    """Call after any write to applications with the change in count per status.
+
+    Versions back the export snapshots; the counters back application stats.
+    """
+    await asyncio.gather(
+        bump_collection_versions("applications", f"applications:{university_id}"),
+        count_applications(university_id, status_counts),
+    )
+
 # ============ HOMEPAGE CONFIG ENDPOINTS ============
 
 # Default config singleton
@@ -259,26 +1016,27 @@ DEFAULT_HOMEPAGE_CONFIG = HomepageConfig()
 @api_router.get("/homepage-config")
 async def get_homepage_config():
     """Public endpoint — returns the current homepage configuration."""
-    doc = await db.homepage_config.find_one({"_id": "singleton"}, {"_id": 0})
-    if doc:
-        return doc
-    return DEFAULT_HOMEPAGE_CONFIG.model_dump()
+    async def load():
+        doc = await catalog_db.homepage_config.find_one({"_id": "singleton"}, {"_id": 0})
+        return doc or DEFAULT_HOMEPAGE_CONFIG.model_dump()
+    return await cached(HOMEPAGE_CONFIG_CACHE_KEY, load, ("homepage_config",))
 
 @api_router.put("/homepage-config")
 async def update_homepage_config(
     config: HomepageConfig,
-    current_user: Dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Admin-only endpoint — update the homepage configuration."""
-    if current_user['role'] != 'admin':
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin only")
     data = config.model_dump()
-    data['updated_at'] = datetime.now(timezone.utc).isoformat()
+    data['updated_at'] = datetime.now(timezone.utc)
     await db.homepage_config.update_one(
         {"_id": "singleton"},
         {"$set": data},
         upsert=True
     )
+    await homepage_config_changed()
     return data
 
 # ============ AUTH ENDPOINTS ============
@@ -286,15 +1044,17 @@ async def update_homepage_config(
 @api_router.post("/auth/register")
 async def register(
     user_data: UserCreate,
+    http_request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
 ):
+    await enforce_rate_limit("register", http_request)
     # Admin and manager roles can only be created by an existing admin
     if user_data.role in ['admin', 'manager']:
         if not credentials:
             raise HTTPException(status_code=403, detail="Only admins can create admin or manager accounts")
         try:
-            current_user = decode_token(credentials.credentials)
-            if current_user.get('role') != 'admin':
+            current_user = await authenticate(credentials.credentials)
+            if current_user.role != 'admin':
                 raise HTTPException(status_code=403, detail="Only admins can create admin or manager accounts")
         except HTTPException:
             raise HTTPException(status_code=403, detail="Only admins can create admin or manager accounts")
@@ -308,7 +1068,7 @@ async def register(
 
     user = User(
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=await hash_password(user_data.password),
         name=user_data.name,
         role=safe_role,
         university_id=user_data.university_id
@@ -330,10 +1090,13 @@ async def register(
     }
 
 @api_router.post("/auth/login")
-async def login(credentials: UserLogin):
+async def login(credentials: UserLogin, http_request: Request):
+    await enforce_rate_limit("login", http_request, credentials.email)
     user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
-    if not user or not verify_password(credentials.password, user['password_hash']):
+    if not user or not await verify_password(credentials.password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if password_needs_rehash(user['password_hash']):
+        run_in_background(rehash_password(user['id'], credentials.password, user['password_hash']))
     
     token = create_token(user['id'], user['email'], user['role'], user.get('university_id'))
     
@@ -349,7 +1112,8 @@ async def login(credentials: UserLogin):
     }
 
 @api_router.post("/auth/request-otp")
-async def request_otp(request: OTPRequest):
+async def request_otp(request: OTPRequest, http_request: Request):
+    await enforce_rate_limit("request_otp", http_request, request.email)
     user = await db.users.find_one({"email": request.email}, {"_id": 0})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -358,11 +1122,11 @@ async def request_otp(request: OTPRequest):
     otp = OTP(
         email=request.email,
         otp=otp_code,
-        expires_at=(datetime.now(timezone.utc) + timedelta(minutes=10)).isoformat()
+        expires_at=datetime.now(timezone.utc) + timedelta(minutes=OTP_TTL_MINUTES)
     )
     
-    await db.otps.delete_many({"email": request.email})
-    await db.otps.insert_one(otp.model_dump())
+    # One OTP per email: a new request replaces the previous code and its attempts
+    await db.otps.update_one({"email": request.email}, {"$set": otp.model_dump()}, upsert=True)
     
     return {
         "message": f"OTP sent to master email {MASTER_EMAIL}",
@@ -372,85 +1136,366 @@ async def request_otp(request: OTPRequest):
 
 @api_router.post("/auth/verify-otp")
 async def verify_otp(data: OTPVerify):
-    otp_record = await db.otps.find_one({"email": data.email}, {"_id": 0})
-    if not otp_record:
-        raise HTTPException(status_code=404, detail="OTP not found")
-    
-    if datetime.fromisoformat(otp_record['expires_at']) < datetime.now(timezone.utc):
-        raise HTTPException(status_code=400, detail="OTP expired")
-    
-    if otp_record['otp'] != data.otp:
+    now = datetime.now(timezone.utc)
+    # A matching, live OTP is consumed in the same operation that checks it;
+    # `attempts` counts the wrong tries so far
+    consumed = await db.otps.find_one_and_delete({
+        "email": data.email,
+        "otp": data.otp,
+        "expires_at": {"$gt": now},
+        "attempts": {"$lt": OTP_MAX_ATTEMPTS},
+    })
+    if not consumed:
+        otp_record = await db.otps.find_one_and_update(
+            {"email": data.email},
+            {"$inc": {"attempts": 1}},
+            projection={"_id": 0, "expires_at": 1, "attempts": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not otp_record:
+            raise HTTPException(status_code=404, detail="OTP not found")
+        expires_at = otp_record.get('expires_at')
+        if not isinstance(expires_at, datetime) or expires_at <= now:
+            raise HTTPException(status_code=400, detail="OTP expired")
+        if otp_record['attempts'] >= OTP_MAX_ATTEMPTS:
+            # That was the last try; a correct code could no longer be accepted
+            await db.otps.delete_one({"email": data.email})
+            raise HTTPException(status_code=400, detail="Too many attempts, request a new OTP")
         raise HTTPException(status_code=400, detail="Invalid OTP")
     
-    new_hash = hash_password(data.new_password)
-    await db.users.update_one(
+    new_hash = await hash_password(data.new_password)
+    user = await db.users.find_one_and_update(
         {"email": data.email},
-        {"$set": {"password_hash": new_hash}}
+        {"$set": {"password_hash": new_hash}},
+        projection={"_id": 0, "id": 1}
     )
-    
-    await db.otps.delete_many({"email": data.email})
+    if user:
+        await revoke_user_tokens(user['id'])
     
     return {"message": "Password reset successful"}
 
+# ============ UNIVERSITY FIELD SELECTION ============
+
+UNIVERSITY_FEE_FIELDS = ('avg_fee', 'min_fee', 'max_fee')
+# Computed from stored fields: thumbnail_url from main_photo, course_names from courses
+UNIVERSITY_VIRTUAL_FIELDS = {'thumbnail_url': 'main_photo', 'course_names': 'courses.course_name'}
+# Stored on older documents only; still filtered on and shown as a fallback
+UNIVERSITY_LEGACY_FIELDS = ('university_category',)
+UNIVERSITY_FIELDS = (
+    tuple(University.model_fields) + tuple(UNIVERSITY_VIRTUAL_FIELDS) + UNIVERSITY_FEE_FIELDS + UNIVERSITY_LEGACY_FIELDS
+)
+UNIVERSITY_FIELD_PRESETS = {
+    # What a listing card or admin table row renders
+    "card": ('id', 'name', 'location', 'state', 'university_categories', 'university_category', 'thumbnail_url',
+             'placement_percentage', 'rating', 'tags', 'avg_fee', 'min_fee', 'course_names'),
+}
+
+def parse_university_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Resolve a `fields=` value into the selected field names; None means the full document."""
+    if not fields or fields == 'full':
+        return None
+    if fields in UNIVERSITY_FIELD_PRESETS:
+        return list(UNIVERSITY_FIELD_PRESETS[fields])
+    selected = list(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    unknown = [f for f in selected if f not in UNIVERSITY_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if 'id' not in selected:
+        selected.insert(0, 'id')
+    return selected
+
+def university_projection(selected: List[str]) -> Dict:
+    projection = {"_id": 0}
+    for field in selected:
+        projection[UNIVERSITY_VIRTUAL_FIELDS.get(field, field)] = 1
+    return projection
+
+def shape_university(doc: Dict, selected: List[str]) -> Dict:
+    shaped = {}
+    for field in selected:
+        if field == 'thumbnail_url':
+            shaped[field] = media_variant_url(doc.get('main_photo'), 'thumb')
+        elif field == 'course_names':
+            shaped[field] = [c.get('course_name') for c in doc.get('courses') or [] if isinstance(c, dict)]
+        else:
+            shaped[field] = doc.get(field)
+    return shaped
+
+# ============ MEDIA ============
+
+_DATA_URL_RE = re.compile(r"^data:([\w.+-]+/[\w.+-]+)?(;[^,]*)?,(.*)$", re.DOTALL)
+_MEDIA_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Strong references to fire-and-forget tasks so they are not garbage collected
+_background_tasks = set()
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def drain_background_tasks():
+    while _background_tasks:
+        await asyncio.gather(*list(_background_tasks), return_exceptions=True)
+
+def media_url(digest: str) -> str:
+    return f"{MEDIA_URL_PREFIX}/{digest}"
+
+def media_variant_url(url: Optional[str], variant: str) -> Optional[str]:
+    """URL of a resized derivative for stored media; external URLs are returned as-is."""
+    if url and url.startswith(MEDIA_URL_PREFIX + "/") and _MEDIA_DIGEST_RE.match(url[len(MEDIA_URL_PREFIX) + 1:]):
+        return f"{url}/{variant}"
+    return url
+
+async def store_media(contents: bytes, content_type: str, filename: str = "", variant_of: Optional[str] = None) -> str:
+    """Store bytes once in the media bucket and return their SHA-256 digest.
+
+    Newly stored images get their resized variants generated in the background,
+    except derivatives themselves, which record the original in `variant_of`.
+    """
+    digest = hashlib.sha256(contents).hexdigest()
+    if not await db.media.files.find_one({"_id": digest}, {"_id": 1}):
+        metadata = {"content_type": content_type}
+        if variant_of:
+            metadata["variant_of"] = variant_of
+        try:
+            await media_bucket().upload_from_stream_with_id(digest, filename or digest, contents, metadata=metadata)
+        except DuplicateKeyError:
+            return digest  # same content stored concurrently
+        if not variant_of and content_type.startswith('image/'):
+            run_in_background(generate_image_variants(digest, contents))
+    return digest
+
+def render_image_variants(contents: bytes) -> Dict[str, Dict[str, bytes]]:
+    """Resize an image into every IMAGE_VARIANTS box as WebP and JPEG. CPU bound."""
+    rendered = {}
+    with Image.open(BytesIO(contents)) as source:
+        image = ImageOps.exif_transpose(source).convert("RGB")
+    for name, box in IMAGE_VARIANTS.items():
+        variant = image.copy()
+        variant.thumbnail(box, Image.Resampling.LANCZOS)
+        webp, jpeg = BytesIO(), BytesIO()
+        variant.save(webp, "WEBP", quality=80, method=4)
+        variant.save(jpeg, "JPEG", quality=82, optimize=True, progressive=True)
+        rendered[name] = {"webp": webp.getvalue(), "jpeg": jpeg.getvalue()}
+    return rendered
+
+async def generate_image_variants(digest: str, contents: bytes):
+    """Render derivatives off the event loop and record them on the original's metadata."""
+    loop = asyncio.get_running_loop()
+    try:
+        rendered = await loop.run_in_executor(image_executor, render_image_variants, contents)
+    except Exception:
+        logger.exception(f"Could not generate image variants for {digest}")
+        return
+    variants = {}
+    for name, formats in rendered.items():
+        variants[name] = {
+            fmt: await store_media(data, f"image/{fmt}", variant_of=digest)
+            for fmt, data in formats.items()
+        }
+    await db.media.files.update_one({"_id": digest}, {"$set": {"metadata.variants": variants}})
+
+def detect_image_type(contents: bytes) -> Optional[str]:
+    """Content type of a JPEG, PNG, WebP or GIF image Pillow can read, else None. CPU bound."""
+    try:
+        with Image.open(BytesIO(contents)) as image:
+            image.verify()
+            return MEDIA_IMAGE_TYPES.get(image.format)
+    except Exception:
+        # Pillow signals unreadable input with several exception types
+        return None
+
+async def store_image(contents: bytes, filename: str = "") -> str:
+    """Validate an uploaded image and store it; 400 unless it is a supported raster image."""
+    if len(contents) > MAX_PHOTO_BYTES:
+        raise HTTPException(status_code=400, detail="Image must be less than 5MB")
+    loop = asyncio.get_running_loop()
+    content_type = await loop.run_in_executor(image_executor, detect_image_type, contents)
+    if content_type is None:
+        raise HTTPException(status_code=400, detail="Image must be a JPEG, PNG, WebP or GIF")
+    return await store_media(contents, content_type, filename)
+
+def decode_data_url(url: str) -> Optional[tuple]:
+    """Return (content_type, bytes) for a base64 data URL, or None."""
+    match = _DATA_URL_RE.match(url or "")
+    if not match or 'base64' not in (match.group(2) or ''):
+        return None
+    try:
+        return match.group(1) or 'application/octet-stream', base64.b64decode(match.group(3))
+    except ValueError:
+        return None
+
+async def externalize_photo(value: Optional[str]) -> Optional[str]:
+    """Move an inline base64 data URL into the media store; other values pass through."""
+    decoded = decode_data_url(value) if value else None
+    if not decoded:
+        return value
+    _, contents = decoded
+    return media_url(await store_image(contents))
+
+async def externalize_university_photos(data: Dict) -> Dict:
+    if data.get('main_photo'):
+        data['main_photo'] = await externalize_photo(data['main_photo'])
+    if data.get('photo_gallery'):
+        data['photo_gallery'] = [await externalize_photo(p) for p in data['photo_gallery']]
+    return data
+
+def parse_byte_range(header: str, length: int) -> Optional[tuple]:
+    """Parse a single `bytes=` range into inclusive (start, end).
+
+    Returns None when the range cannot be satisfied; multi-range requests are
+    treated as covering the whole file.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return 0, length - 1
+    first, _, last = spec.strip().partition('-')
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else length - 1
+        else:
+            start = max(length - int(last), 0)
+            end = length - 1
+    except ValueError:
+        return None
+    end = min(end, length - 1)
+    if start > end or start >= length:
+        return None
+    return start, end
+
+async def media_response(digest: str, request: Request, cache_control: str, extra_headers: Optional[Dict] = None):
+    etag = f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        **MEDIA_SECURITY_HEADERS,
+        **(extra_headers or {}),
+    }
+    if_none_match = request.headers.get('if-none-match', '')
+    if if_none_match.strip() == '*' or etag in if_none_match:
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        grid_out = await media_bucket().open_download_stream(digest)
+    except NoFile:
+        raise HTTPException(status_code=404, detail="Media not found")
+    
+    length = grid_out.length
+    start, end = 0, length - 1
+    status_code = 200
+    range_header = request.headers.get('range')
+    if range_header and length:
+        byte_range = parse_byte_range(range_header, length)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{length}"})
+        start, end = byte_range
+        if (start, end) != (0, length - 1):
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    async def body():
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(MEDIA_STREAM_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    
+    # Anything stored before uploads were validated goes out as opaque bytes
+    content_type = (grid_out.metadata or {}).get('content_type')
+    if content_type not in MEDIA_IMAGE_TYPES.values():
+        content_type = 'application/octet-stream'
+    return StreamingResponse(body(), status_code=status_code, media_type=content_type, headers=headers)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@api_router.get("/media/{digest}")
+async def get_media(digest: str, request: Request):
+    """Public endpoint — stream a stored image. Content never changes for a digest."""
+    if not _MEDIA_DIGEST_RE.match(digest):
+        raise HTTPException(status_code=404, detail="Media not found")
+    return await media_response(digest, request, IMMUTABLE_CACHE_CONTROL)
+
+@api_router.get("/media/{digest}/{variant}")
+async def get_media_variant(digest: str, variant: str, request: Request):
+    """Public endpoint — stream a resized derivative, WebP when the client accepts it.
+
+    Falls back to the original (briefly cached) while derivatives are still being generated.
+    """
+    if not _MEDIA_DIGEST_RE.match(digest) or variant not in IMAGE_VARIANTS:
+        raise HTTPException(status_code=404, detail="Media not found")
+    
+    doc = await db.media.files.find_one({"_id": digest}, {"metadata.variants": 1})
+    if not doc:
+        raise HTTPException(status_code=404, detail="Media not found")
+    formats = ((doc.get('metadata') or {}).get('variants') or {}).get(variant)
+    if not formats:
+        return await media_response(digest, request, "public, max-age=60")
+    
+    fmt = 'webp' if 'image/webp' in request.headers.get('accept', '') else 'jpeg'
+    return await media_response(formats[fmt], request, IMMUTABLE_CACHE_CONTROL, {"Vary": "Accept"})
+
 # ============ UNIVERSITY ENDPOINTS ============
 
 @api_router.post("/universities/upload-photo")
 async def upload_university_photo(
     file: UploadFile = File(...),
-    current_user: Dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Upload a university photo and return a base64 data URL."""
-    if current_user['role'] not in ['admin', 'manager']:
+    """Upload a university photo into the media store and return its URL."""
+    if current_user.role not in ['admin', 'manager']:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
-    # Validate file type
-    if not file.content_type.startswith('image/'):
-        raise HTTPException(status_code=400, detail="File must be an image")
-    
-    # Read the file and convert to base64
     contents = await file.read()
-    if len(contents) > 5 * 1024 * 1024:  # 5MB limit
-        raise HTTPException(status_code=400, detail="Image must be less than 5MB")
-    
-    b64 = base64.b64encode(contents).decode('utf-8')
-    data_url = f"data:{file.content_type};base64,{b64}"
-    
-    return {"photo_url": data_url}
+    digest = await store_image(contents, file.filename or "")
+    return {"photo_url": media_url(digest)}
 
 @api_router.post("/universities", response_model=University)
-async def create_university(university_data: UniversityCreate, current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] != 'admin':
+async def create_university(university_data: UniversityCreate, current_user: Principal = Depends(get_current_user)):
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Only admins can create universities")
     
-    university = University(**university_data.model_dump())
-    await db.universities.insert_one(university.model_dump())
+    university = University(**await externalize_university_photos(university_data.model_dump()))
+    doc = university.model_dump(exclude={'thumbnail_url'})
+    doc.update(university_derived_fields(doc))
+    await db.universities.insert_one(doc)
+    await universities_changed()
     return university
 
 @api_router.get("/universities/filter-options")
 async def get_university_filter_options():
     """Return unique locations and categories from the universities collection."""
-    all_unis = await db.universities.find({}, {"_id": 0, "location": 1, "university_categories": 1, "university_category": 1}).to_list(1000)
-    locations = sorted(set(u['location'].strip() for u in all_unis if u.get('location', '').strip()))
-    categories_docs = await db.categories.find({}, {"_id": 0, "name": 1}).to_list(1000)
-    dynamic_cats = [c['name'] for c in categories_docs]
+    return await cached(FILTER_OPTIONS_CACHE_KEY, load_university_filter_options, ("universities", "categories"))
+
+async def load_university_filter_options() -> Dict:
+    raw_locations, dynamic_cats, list_cats, legacy_cats = await asyncio.gather(
+        catalog_db.universities.distinct('location'),
+        catalog_db.categories.distinct('name'),
+        catalog_db.universities.distinct('university_categories'),
+        catalog_db.universities.distinct('university_category'),
+    )
+    locations = sorted(set(l.strip() for l in raw_locations if isinstance(l, str) and l.strip()))
     
     # Merge with existing ones for safety, but primary should be dynamic
     cats = set(dynamic_cats)
-    for u in all_unis:
-        for c in u.get('university_categories', []):
-            if c and c.strip():
-                cats.add(c.strip())
-        legacy = u.get('university_category', '')
-        if legacy and legacy.strip():
-            cats.add(legacy.strip())
+    for c in list_cats + legacy_cats:
+        if isinstance(c, str) and c.strip():
+            cats.add(c.strip())
     categories = sorted(cats)
     return {"locations": locations, "categories": categories}
 
 # ============ CATEGORY CRUD ENDPOINTS ============
 
 @api_router.post("/categories", response_model=Category)
-async def create_category(cat_data: CategoryCreate, current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] != 'admin':
+async def create_category(cat_data: CategoryCreate, current_user: Principal = Depends(get_current_user)):
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin only")
     
     # Check if exists
@@ -460,15 +1505,16 @@ async def create_category(cat_data: CategoryCreate, current_user: Dict = Depends
         
     category = Category(name=cat_data.name)
     await db.categories.insert_one(category.model_dump())
+    await categories_changed()
     return category
 
 @api_router.get("/categories", response_model=List[Category])
 async def get_categories():
-    return await db.categories.find({}, {"_id": 0}).to_list(1000)
+    return await catalog_db.categories.find({}, {"_id": 0}).to_list(1000)
 
 @api_router.put("/categories/{category_id}", response_model=Category)
-async def update_category(category_id: str, cat_data: CategoryCreate, current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] != 'admin':
+async def update_category(category_id: str, cat_data: CategoryCreate, current_user: Principal = Depends(get_current_user)):
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin only")
         
     result = await db.categories.update_one(
@@ -478,21 +1524,23 @@ async def update_category(category_id: str, cat_data: CategoryCreate, current_us
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Category not found")
+    await categories_changed()
         
     return await db.categories.find_one({"id": category_id}, {"_id": 0})
 
 @api_router.delete("/categories/{category_id}")
-async def delete_category(category_id: str, current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] != 'admin':
+async def delete_category(category_id: str, current_user: Principal = Depends(get_current_user)):
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin only")
         
     result = await db.categories.delete_one({"id": category_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Category not found")
+    await categories_changed()
         
     return {"message": "Category deleted"}
 
-@api_router.get("/universities", response_model=List[University])
+@api_router.get("/universities", response_model=Union[List[University], UniversityPage])
 async def get_universities(
     search: Optional[str] = None,
     location: Optional[str] = None,
@@ -502,21 +1550,36 @@ async def get_universities(
     min_fee: Optional[float] = None,
     max_fee: Optional[float] = None,
     min_rating: Optional[float] = None,
-    min_placement: Optional[float] = None
+    min_placement: Optional[float] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = Query('desc', pattern='^(asc|desc)$'),
+    include_total: bool = False,
+    fields: Optional[str] = None
 ):
+    """List universities.
+
+    Passing `limit` or `cursor` returns a keyset-paged `UniversityPage`;
+    without them a plain list of at most MAX_UNPAGED_UNIVERSITIES matches is
+    returned, as before. `fields` takes a comma-separated field list, "card"
+    (the default) or "full"; editors load the full document of one university
+    from GET /universities/{id}.
+    """
+    paged = limit is not None or cursor is not None
+    selected = parse_university_fields(fields if fields is not None else 'card')
+    if sort is not None and sort not in UNIVERSITY_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(UNIVERSITY_SORT_FIELDS)}")
+    
     query = {}
+    projection = university_projection(selected) if selected else {"_id": 0, "search_terms": 0}
+    sort_spec = None
     
-    if search:
-        query['$or'] = [
-            {'name': {'$regex': search, '$options': 'i'}},
-            {'tags': {'$regex': search, '$options': 'i'}},
-            {'location': {'$regex': search, '$options': 'i'}},
-            {'state': {'$regex': search, '$options': 'i'}},
-            {'courses.course_name': {'$regex': search, '$options': 'i'}},
-            {'courses.category': {'$regex': search, '$options': 'i'}},
-            {'description': {'$regex': search, '$options': 'i'}},
-            {'university_categories': {'$elemMatch': {'$regex': search, '$options': 'i'}}},
-        ]
+    search_text = normalize_search_query(search) if search else ""
+    if search_text:
+        query['$text'] = {'$search': search_text}
+        projection['score'] = {'$meta': 'textScore'}
+        sort_spec = [('score', {'$meta': 'textScore'})]
     
     if location:
         query['location'] = {'$regex': location, '$options': 'i'}
@@ -529,7 +1592,7 @@ async def get_universities(
 
     if category:
         # Match if the given category is in the university_categories array, or matches legacy field
-        query['$or'] = query.get('$or', []) + [
+        query['$or'] = [
             {'university_categories': category},
             {'university_category': {'$regex': category, '$options': 'i'}},
         ]
@@ -540,28 +1603,77 @@ async def get_universities(
     if min_placement is not None:
         query['placement_percentage'] = {'$gte': min_placement}
     
-    universities = await db.universities.find(query, {"_id": 0}).to_list(1000)
-    
     if min_fee is not None or max_fee is not None:
-        filtered = []
-        for uni in universities:
-            if uni.get('fee_structure'):
-                fees = [fs['annual_fee'] for fs in uni['fee_structure']]
-                if fees:
-                    avg_fee = sum(fees) / len(fees)
-                    if min_fee is not None and avg_fee < min_fee:
-                        continue
-                    if max_fee is not None and avg_fee > max_fee:
-                        continue
-            filtered.append(uni)
-        universities = filtered
-    
+        fee_range = {}
+        if min_fee is not None:
+            fee_range['$gte'] = min_fee
+        if max_fee is not None:
+            fee_range['$lte'] = max_fee
+        # Universities without any known fee are kept, as before
+        query['$and'] = [{'$or': [{'avg_fee': fee_range}, {'avg_fee': None}]}]
+    
+    # Relevance-ranked searches page by offset; everything else by (sort key, id)
+    sort_field = None
+    descending = order == 'desc'
+    if sort or (paged and not search_text):
+        sort_field = sort or 'rating'
+        direction = DESCENDING if descending else ASCENDING
+        sort_spec = [(sort_field, direction), ('id', direction)]
+        if selected:
+            projection[sort_field] = 1  # needed to build the next cursor
+    
+    page_size = limit or MAX_PAGE_SIZE
+    total = None
+    if paged and include_total:
+        total = await catalog_db.universities.count_documents(query)
+    
+    find_query = query
+    skip = 0
+    if cursor:
+        position = decode_cursor(cursor)
+        if sort_field:
+            if position.get('sort') != sort_field or position.get('order') != order or 'id' not in position:
+                raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+            after = keyset_filter(sort_field, position.get('value'), position['id'], descending)
+            find_query = {'$and': [query, after]} if query else after
+        else:
+            skip = position.get('skip')
+            if not isinstance(skip, int) or skip < 0:
+                raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+    
+    db_cursor = catalog_db.universities.find(find_query, projection)
+    if sort_spec:
+        db_cursor = db_cursor.sort(sort_spec)
+    if paged:
+        # Fetch one extra row to learn whether another page exists
+        db_cursor = db_cursor.skip(skip).limit(page_size + 1)
+    else:
+        db_cursor = db_cursor.limit(MAX_UNPAGED_UNIVERSITIES)
+    universities = await db_cursor.to_list(None)
+    
+    next_cursor = None
+    if paged and len(universities) > page_size:
+        universities = universities[:page_size]
+        last = universities[-1]
+        if sort_field:
+            next_cursor = encode_cursor({'sort': sort_field, 'order': order, 'value': last.get(sort_field), 'id': last['id']})
+        else:
+            next_cursor = encode_cursor({'skip': skip + page_size})
+    
+    if selected:
+        # Sparse rows skip University validation and go out as plain JSON
+        items = [shape_university(uni, selected) for uni in universities]
+        if paged:
+            return JSONResponse(jsonable_encoder({"items": items, "next_cursor": next_cursor, "total": total}))
+        return JSONResponse(jsonable_encoder(items))
+    if paged:
+        return UniversityPage(items=universities, next_cursor=next_cursor, total=total)
     return universities
 
 @api_router.get("/universities/bulk-template/download")
-async def download_bulk_template(current_user: Dict = Depends(get_current_user)):
+async def download_bulk_template(current_user: Principal = Depends(get_current_user)):
     """Download a sample Excel template for bulk university upload."""
-    if current_user['role'] != 'admin':
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin only")
     
     wb = Workbook()
@@ -654,7 +1766,8 @@ async def download_bulk_template(current_user: Dict = Depends(get_current_user))
         ["  • Do NOT change or delete the header row (row 1)."],
         ["  • You can delete the 2 sample rows before uploading."],
         ["  • Photos can be added individually after bulk upload via the Edit button."],
-        ["  • Maximum 200 universities per upload."],
+        [f"  • Maximum {MAX_BULK_UPLOAD_ROWS:,} universities per upload."],
+        ["  • A CSV file with the same header row is also accepted."],
     ]
     for row in instructions:
         ws2.append(row)
@@ -672,393 +1785,1268 @@ async def download_bulk_template(current_user: Dict = Depends(get_current_user))
         headers={"Content-Disposition": "attachment; filename=university_bulk_upload_template.xlsx"}
     )
 
-@api_router.post("/universities/bulk-upload")
-async def bulk_upload_universities(
-    file: UploadFile = File(...),
-    current_user: Dict = Depends(get_current_user)
-):
-    """Bulk upload universities from an Excel file."""
-    if current_user['role'] != 'admin':
-        raise HTTPException(status_code=403, detail="Admin only")
-    
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="File must be an Excel file (.xlsx or .xls)")
+BULK_WRITE_BATCH_SIZE = 500
+MAX_BULK_UPLOAD_ROWS = int(os.environ.get('MAX_BULK_UPLOAD_ROWS', '50000'))
+BULK_REQUIRED_COLUMNS = {'name', 'location', 'description', 'placement_percentage'}
+# Fields an upsert only sets when it creates the university, so re-uploads keep edits made in the UI
+BULK_INSERT_ONLY_FIELDS = ('id', 'created_at', 'main_photo', 'photo_gallery', 'university_categories')
+
+def parse_university_row(row_data: Dict) -> Dict:
+    """Build a university document from one spreadsheet row. Raises ValueError on bad data."""
+    name = str(row_data.get('name', '')).strip()
+    location = str(row_data.get('location', '') or '').strip()
+    state = str(row_data.get('state', '') or '').strip()
+    description = str(row_data.get('description', '') or '').strip()
+    placement_raw = row_data.get('placement_percentage', 0)
+    placement_percentage = float(placement_raw) if placement_raw else 0.0
+    rating_raw = row_data.get('rating', 0)
+    rating = float(rating_raw) if rating_raw else 0.0
+
+    courses_raw = str(row_data.get('courses', '') or '')
+    courses_names = [c.strip() for c in courses_raw.split(',') if c.strip()]
+    courses = [
+        {
+            "course_name": c_name,
+            "description": "",
+            "duration": "N/A",
+            "fees": 0.0,
+            "category": "Uncategorized"
+        } for c_name in courses_names
+    ]
+
+    # Tags - comma-separated
+    tags_raw = str(row_data.get('tags', '') or '')
+    tags = [t.strip() for t in tags_raw.split(',') if t.strip()]
+
+    # Contact details
+    contact_details = {}
+    email_val = str(row_data.get('email', '') or '').strip()
+    phone_val = str(row_data.get('phone', '') or '').strip()
+    website_val = str(row_data.get('website', '') or '').strip()
+    if email_val:
+        contact_details['email'] = email_val
+    if phone_val:
+        contact_details['phone'] = phone_val
+    if website_val:
+        contact_details['website'] = website_val
+
+    if not name or not location or not description:
+        raise ValueError("Missing required fields (name, location, description)")
+
+    university = University(
+        name=name,
+        location=location,
+        state=state,
+        main_photo="",  # No photo - will show placeholder
+        description=description,
+        courses=courses,
+        placement_percentage=placement_percentage,
+        rating=rating,
+        tags=tags,
+        contact_details=contact_details
+    )
+    doc = university.model_dump(exclude={'thumbnail_url'})
+    doc.update(university_derived_fields(doc))
+    return doc
+
+async def write_university_batch(batch: List[tuple], mode: str, result: Dict, session=None):
+    """Write a batch of (row number, document) pairs with one bulk_write.
+
+    Outside a transaction the batch is unordered, and each failed write is
+    reported against its spreadsheet row. Inside one, the first failure
+    raises so the caller can abort.
+    """
+    if mode == 'upsert':
+        ops = [
+            UpdateOne(
+                {"name": doc['name']},
+                {
+                    "$set": {k: v for k, v in doc.items() if k not in BULK_INSERT_ONLY_FIELDS},
+                    "$setOnInsert": {k: doc[k] for k in BULK_INSERT_ONLY_FIELDS},
+                },
+                upsert=True
+            ) for _, doc in batch
+        ]
+    else:
+        ops = [InsertOne(doc) for _, doc in batch]
     
-    contents = await file.read()
+    failed = {}
     try:
-        wb = load_workbook(BytesIO(contents))
-        ws = wb.active
-    except Exception:
-        raise HTTPException(status_code=400, detail="Could not read Excel file. Please use the provided template.")
-    
-    # Read headers from first row
-    headers = [str(cell.value).strip().lower() if cell.value else '' for cell in ws[1]]
-    
-    required_fields = {'name', 'location', 'description', 'placement_percentage'}
-    missing = required_fields - set(headers)
+        write_result = await db.universities.bulk_write(ops, ordered=session is not None, session=session)
+        upserted = write_result.upserted_ids or {}
+    except BulkWriteError as e:
+        if session is not None:
+            raise
+        failed = {err['index']: err.get('errmsg', 'Write failed') for err in e.details.get('writeErrors', [])}
+        upserted = {u['index']: u['_id'] for u in e.details.get('upserted', [])}
+    
+    updated = []
+    for i, (row_idx, doc) in enumerate(batch):
+        if i in failed:
+            result['errors'].append(f"Row {row_idx}: {failed[i]}")
+        elif mode == 'insert' or i in upserted:
+            result['created'].append(doc['name'])
+        else:
+            result['updated'].append(doc['name'])
+            updated.append(doc['name'])
+    if updated:
+        await refresh_derived_fields(updated, session)
+
+async def refresh_derived_fields(names: List[str], session=None):
+    """Recompute the derived fields of universities updated by an upsert.
+
+    The row document lacks the fields in BULK_INSERT_ONLY_FIELDS that the
+    upsert kept (categories feed `search_terms`), so the values it set are
+    rebuilt from the stored documents.
+    """
+    ops = []
+    async for uni in db.universities.find({"name": {"$in": names}}, session=session):
+        derived = university_derived_fields(uni)
+        if any(uni.get(key) != value for key, value in derived.items()):
+            ops.append(UpdateOne({"_id": uni["_id"]}, {"$set": derived}))
+    if ops:
+        await db.universities.bulk_write(ops, ordered=False, session=session)
+
+def open_university_rows(fileobj, filename: str):
+    """Return an iterator of (row number, row dict) over an .xlsx or .csv upload.
+
+    The header row is read eagerly so column errors surface before any import
+    work; the remaining rows are streamed (read-only workbook or csv reader).
+    Blocking — call from a worker thread.
+    """
+    workbook = None
+    if filename.lower().endswith('.csv'):
+        rows = csv.reader(io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline=''))
+        header_row = next(rows, [])
+    else:
+        try:
+            workbook = load_workbook(fileobj, read_only=True, data_only=True)
+            rows = workbook.active.iter_rows(values_only=True)
+            header_row = next(rows, ())
+        except Exception:
+            raise HTTPException(status_code=400, detail="Could not read Excel file. Please use the provided template.")
+    
+    headers = [str(value).strip().lower() if value else '' for value in header_row]
+    missing = BULK_REQUIRED_COLUMNS - set(headers)
     if missing:
+        if workbook:
+            workbook.close()
         raise HTTPException(
             status_code=400,
             detail=f"Missing required columns: {', '.join(missing)}. Please use the provided template."
         )
     
-    created = []
-    errors = []
-    
-    for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-        row_data = dict(zip(headers, row))
-        
+    def iterate():
+        try:
+            for row_idx, row in enumerate(rows, start=2):
+                yield row_idx, dict(zip(headers, row))
+        finally:
+            if workbook:
+                workbook.close()
+    return iterate()
+
+def parse_university_chunk(rows, size: int, skip_through_row: int = 0) -> tuple:
+    """Parse up to `size` non-empty rows into (parsed, errors, last row number).
+
+    Rows numbered up to `skip_through_row` were imported by an earlier attempt
+    and are skipped. Blocking — call from a worker thread.
+    """
+    parsed, errors = [], []
+    last_row = None
+    for row_idx, row_data in rows:
+        last_row = row_idx
         # Skip empty rows
-        if not row_data.get('name') or str(row_data.get('name', '')).strip() == '':
+        if row_idx <= skip_through_row or not str(row_data.get('name') or '').strip():
             continue
-        
         try:
-            name = str(row_data.get('name', '')).strip()
-            location = str(row_data.get('location', '')).strip()
-            state = str(row_data.get('state', '') or '').strip()
-            description = str(row_data.get('description', '')).strip()
-            placement_raw = row_data.get('placement_percentage', 0)
-            placement_percentage = float(placement_raw) if placement_raw else 0.0
-            rating_raw = row_data.get('rating', 0)
-            rating = float(rating_raw) if rating_raw else 0.0
-
-            courses_raw = str(row_data.get('courses', '') or '')
-            courses_names = [c.strip() for c in courses_raw.split(',') if c.strip()]
-            courses = [
-                {
-                    "course_name": c_name,
-                    "description": "",
-                    "duration": "N/A",
-                    "fees": 0.0,
-                    "category": "Uncategorized"
-                } for c_name in courses_names
-            ]
-
-            # Tags - comma-separated
-            tags_raw = str(row_data.get('tags', '') or '')
-            tags = [t.strip() for t in tags_raw.split(',') if t.strip()]
-
-            # Contact details
-            contact_details = {}
-            email_val = str(row_data.get('email', '') or '').strip()
-            phone_val = str(row_data.get('phone', '') or '').strip()
-            website_val = str(row_data.get('website', '') or '').strip()
-            if email_val:
-                contact_details['email'] = email_val
-            if phone_val:
-                contact_details['phone'] = phone_val
-            if website_val:
-                contact_details['website'] = website_val
-
-            if not name or not location or not description:
-                errors.append(f"Row {row_idx}: Missing required fields (name, location, description)")
-                continue
-
-            university = University(
-                name=name,
-                location=location,
-                state=state,
-                main_photo="",  # No photo - will show placeholder
-                description=description,
-                courses=courses,
-                placement_percentage=placement_percentage,
-                rating=rating,
-                tags=tags,
-                contact_details=contact_details
-            )
-            await db.universities.insert_one(university.model_dump())
-            created.append(name)
-
+            parsed.append((row_idx, parse_university_row(row_data)))
         except Exception as e:
             errors.append(f"Row {row_idx}: {str(e)}")
+        if len(parsed) + len(errors) >= size:
+            break
+    return parsed, errors, last_row
+
+async def import_universities(rows, mode: str, atomic: bool, result: Dict, progress=None, resume: Optional[Dict] = None):
+    """Stream rows into the universities collection one parsed batch at a time.
+
+    Parsing runs in a worker thread, so memory stays bounded by the batch size.
+    With `atomic`, everything runs in one transaction that is aborted on the
+    first write error or if any row was invalid. `progress(processed, last_row)`
+    is awaited after every batch; `resume` ({"processed", "last_row"}) continues
+    an interrupted non-atomic import after the last written row.
+
+    A resumed import replays the batch that was being written when it was
+    interrupted, since `last_row` is only recorded after the write. Upserts
+    converge, but in insert mode rows of that batch may be inserted twice.
+    """
+    resume = resume or {}
+    skip_through_row = resume.get('last_row') or 0
+    
+    async def pump(session=None):
+        processed = resume.get('processed') or 0
+        while True:
+            size = min(BULK_WRITE_BATCH_SIZE, MAX_BULK_UPLOAD_ROWS - processed)
+            if size <= 0:
+                extra, extra_errors, _ = await run_in_threadpool(parse_university_chunk, rows, 1, skip_through_row)
+                if extra or extra_errors:
+                    result['errors'].append(f"Upload stopped: at most {MAX_BULK_UPLOAD_ROWS} rows are imported per file")
+                break
+            parsed, errors, last_row = await run_in_threadpool(parse_university_chunk, rows, size, skip_through_row)
+            if not parsed and not errors:
+                break
+            processed += len(parsed) + len(errors)
+            result['errors'].extend(errors)
+            if parsed and not (atomic and result['errors']):  # atomic uploads keep validating but stop writing
+                try:
+                    await write_university_batch(parsed, mode, result, session)
+                except BulkWriteError as e:
+                    error = e.details['writeErrors'][0]
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Upload rolled back, nothing was imported. Row {parsed[error['index']][0]}: {error.get('errmsg')}"
+                    )
+            if progress:
+                await progress(processed, last_row)
+        if atomic and result['errors']:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Upload rejected, nothing was imported. {len(result['errors'])} invalid rows: " + "; ".join(result['errors'][:20])
+            )
     
-    return {
-        "message": f"Bulk upload complete. {len(created)} universities created.",
-        "created_count": len(created),
-        "created": created,
-        "errors": errors,
-        "error_count": len(errors)
+    if not atomic:
+        await pump()
+        return
+    try:
+        async with await client.start_session() as session:
+            async with session.start_transaction():
+                await pump(session)
+    except OperationFailure as e:
+        if e.code == 20:  # IllegalOperation: standalone server
+            raise HTTPException(status_code=400, detail="All-or-nothing uploads need MongoDB running as a replica set")
+        raise
+
+# ============ BULK IMPORT JOBS ============
+
+# Uploads are parked in the "imports" GridFS bucket and processed by
+# IMPORT_WORKERS background tasks per server process. Jobs are claimed
+# atomically from `import_jobs`, so any process can pick up queued work and a
+# job whose heartbeat stopped (server restart) is resumed after its last
+# recorded batch.
+IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', '2'))
+IMPORT_JOB_POLL_SECONDS = 5
+IMPORT_JOB_STALE_SECONDS = 300
+IMPORT_JOB_MAX_ATTEMPTS = 3
+IMPORT_JOB_DETAIL_LIMIT = 1000  # names/errors kept on the job document; counts stay exact
+_import_job_wakeup = asyncio.Event()
+_import_workers = []
+
+def imports_bucket() -> AsyncIOMotorGridFSBucket:
+    return gridfs_bucket("imports")
+
+async def claim_import_job() -> Optional[Dict]:
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=IMPORT_JOB_STALE_SECONDS)
+    return await db.import_jobs.find_one_and_update(
+        {"$or": [
+            {"status": "queued"},
+            {"status": "running", "heartbeat_at": {"$lt": stale}},
+        ]},
+        {"$set": {"status": "running", "heartbeat_at": now}, "$inc": {"attempts": 1}},
+        sort=[("created_at", ASCENDING)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def run_import_job(job: Dict):
+    job_id = job['id']
+    if job['attempts'] > IMPORT_JOB_MAX_ATTEMPTS:
+        await finish_import_job(job, {"status": "failed", "detail": f"Import gave up after {IMPORT_JOB_MAX_ATTEMPTS} attempts"})
+        return
+    
+    # Atomic jobs were rolled back when interrupted and start over
+    resume = {} if job['atomic'] else {"processed": job.get('rows_processed', 0), "last_row": job.get('last_row', 0)}
+    carried = {key: (job.get(f"{key}_count", 0) if resume else 0) for key in ('created', 'updated', 'error')}
+    kept = {key: (job.get(key, []) if resume else []) for key in ('created', 'updated', 'errors')}
+    result = {"created": [], "updated": [], "errors": []}
+    
+    def counts() -> Dict:
+        return {
+            "created_count": carried['created'] + len(result['created']),
+            "updated_count": carried['updated'] + len(result['updated']),
+            "error_count": carried['error'] + len(result['errors']),
+        }
+    
+    async def progress(processed: int, last_row: int):
+        await db.import_jobs.update_one({"id": job_id}, {"$set": {
+            "rows_processed": processed,
+            "last_row": last_row,
+            "heartbeat_at": datetime.now(timezone.utc),
+            **counts(),
+        }})
+    
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as upload:
+            await imports_bucket().download_to_stream(job['file_id'], upload)
+            upload.seek(0)
+            rows = await run_in_threadpool(open_university_rows, upload, job['filename'])
+            await import_universities(rows, job['mode'], job['atomic'], result, progress, resume)
+    except HTTPException as e:
+        await finish_import_job(job, {"status": "failed", "detail": e.detail})
+        return
+    except Exception:
+        logger.exception(f"Bulk import job {job_id} failed")
+        await finish_import_job(job, {"status": "failed", "detail": "Bulk upload failed unexpectedly."})
+        return
+    finally:
+        if result['created'] or result['updated']:
+            await universities_changed()
+    
+    totals = counts()
+    await finish_import_job(job, {
+        "status": "completed",
+        "message": f"Bulk upload complete. {totals['created_count']} universities created, {totals['updated_count']} updated.",
+        **totals,
+        **{key: (kept[key] + result[key])[:IMPORT_JOB_DETAIL_LIMIT] for key in result},
+    })
+
+async def finish_import_job(job: Dict, update: Dict):
+    update['finished_at'] = datetime.now(timezone.utc)
+    await db.import_jobs.update_one({"id": job['id']}, {"$set": update})
+    try:
+        await imports_bucket().delete(job['file_id'])
+    except NoFile:
+        pass
+
+async def import_worker():
+    while True:
+        _import_job_wakeup.clear()
+        try:
+            job = await claim_import_job()
+        except Exception:
+            logger.exception("Could not claim a bulk import job")
+            job = None
+        if job is None:
+            try:
+                await asyncio.wait_for(_import_job_wakeup.wait(), IMPORT_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        try:
+            await run_import_job(job)
+        except Exception:
+            # e.g. the job could not be marked finished; it is retried once stale
+            logger.exception(f"Bulk import job {job['id']} was interrupted")
+
+def start_import_workers():
+    for _ in range(IMPORT_WORKERS):
+        _import_workers.append(asyncio.create_task(import_worker()))
+
+async def stop_import_workers():
+    for task in _import_workers:
+        task.cancel()
+    await asyncio.gather(*_import_workers, return_exceptions=True)
+    _import_workers.clear()
+
+@api_router.post("/universities/bulk-upload", status_code=status.HTTP_202_ACCEPTED)
+async def bulk_upload_universities(
+    file: UploadFile = File(...),
+    mode: str = Query('insert', pattern='^(insert|upsert)$'),
+    atomic: bool = False,
+    current_user: Principal = Depends(get_current_user)
+):
+    """Queue a bulk upload of universities from an Excel or CSV file.
+
+    `mode=upsert` matches rows to existing universities by name and updates
+    them. `atomic=true` imports all rows or none. Poll
+    GET /universities/bulk-upload/{job_id} for progress and the result.
+    """
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin only")
+    
+    filename = file.filename or ''
+    if not filename.lower().endswith(('.xlsx', '.xls', '.csv')):
+        raise HTTPException(status_code=400, detail="File must be an Excel file (.xlsx or .xls) or a CSV file")
+    
+    # UploadFile has spooled large bodies to disk; copy it from there into GridFS
+    file_id = await imports_bucket().upload_from_stream(filename, file.file)
+    job = {
+        "id": str(uuid.uuid4()),
+        "status": "queued",
+        "filename": filename,
+        "file_id": file_id,
+        "mode": mode,
+        "atomic": atomic,
+        "created_by": current_user.user_id,
+        "created_at": datetime.now(timezone.utc),
+        "attempts": 0,
+        "rows_processed": 0,
+        "created_count": 0,
+        "updated_count": 0,
+        "error_count": 0,
     }
+    await db.import_jobs.insert_one(job)
+    _import_job_wakeup.set()
+    
+    return {"job_id": job['id'], "status": "queued", "message": "Bulk upload queued."}
+
+@api_router.get("/universities/bulk-upload/{job_id}")
+async def get_bulk_upload_job(job_id: str, current_user: Principal = Depends(get_current_user)):
+    """Progress and, once finished, the result of a bulk upload job."""
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin only")
+    
+    job = await db.import_jobs.find_one({"id": job_id}, {"_id": 0, "file_id": 0, "last_row": 0, "heartbeat_at": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
 
 @api_router.get("/universities/{university_id}", response_model=University)
-async def get_university(university_id: str):
-    university = await db.universities.find_one({"id": university_id}, {"_id": 0})
+async def get_university(university_id: str, fields: Optional[str] = None):
+    selected = parse_university_fields(fields)
+    projection = university_projection(selected) if selected else {"_id": 0, "search_terms": 0}
+    university = await catalog_db.universities.find_one({"id": university_id}, projection)
     if not university:
         raise HTTPException(status_code=404, detail="University not found")
+    if selected:
+        return JSONResponse(jsonable_encoder(shape_university(university, selected)))
     return university
 
+UNIVERSITY_UPDATE_ATTEMPTS = 3
+
 @api_router.put("/universities/{university_id}", response_model=University)
 async def update_university(
     university_id: str,
     university_data: UniversityUpdate,
-    current_user: Dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    if current_user['role'] == 'manager' and current_user.get('university_id') != university_id:
+    if current_user.role == 'manager' and current_user.university_id != university_id:
         raise HTTPException(status_code=403, detail="You can only update your own university")
     
-    if current_user['role'] not in ['admin', 'manager']:
+    if current_user.role not in ['admin', 'manager']:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
     update_data = {k: v for k, v in university_data.model_dump().items() if v is not None}
     if not update_data:
         raise HTTPException(status_code=400, detail="No data to update")
-    
-    result = await db.universities.update_one(
-        {"id": university_id},
-        {"$set": update_data}
-    )
-    
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="University not found")
-    
-    university = await db.universities.find_one({"id": university_id}, {"_id": 0})
-    return university
+    await externalize_university_photos(update_data)
+    
+    # The changes and the fields derived from the result are written together,
+    # on condition that the inputs of those fields are still as read; a
+    # concurrent update in between makes us re-read and try again.
+    for _ in range(UNIVERSITY_UPDATE_ATTEMPTS):
+        current = await db.universities.find_one({"id": university_id}, {"_id": 0})
+        if not current:
+            raise HTTPException(status_code=404, detail="University not found")
+        derived = university_derived_fields({**current, **update_data})
+        university = await db.universities.find_one_and_update(
+            {"id": university_id, **{field: current.get(field) for field in DERIVED_SOURCE_FIELDS}},
+            {"$set": {**update_data, **derived}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if university:
+            await universities_changed()
+            return university
+    raise HTTPException(status_code=409, detail="The university was changed by someone else at the same time, please try again")
 
 @api_router.delete("/universities/{university_id}")
-async def delete_university(university_id: str, current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] != 'admin':
+async def delete_university(university_id: str, current_user: Principal = Depends(get_current_user)):
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Only admins can delete universities")
     
     result = await db.universities.delete_one({"id": university_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="University not found")
+    await universities_changed()
     
     return {"message": "University deleted"}
 
 @api_router.get("/universities/{university_id}/applications/export")
-async def export_university_applications(university_id: str, current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] not in ['admin', 'manager']:
+async def export_university_applications(
+    university_id: str,
+    request: Request,
+    format: str = Query('xlsx', pattern='^(xlsx|csv|ndjson)$'),
+    status: Optional[str] = None,
+    course_interest: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role not in ['admin', 'manager']:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
-    if current_user['role'] == 'manager' and current_user.get('university_id') != university_id:
+    if current_user.role == 'manager' and current_user.university_id != university_id:
         raise HTTPException(status_code=403, detail="You can only export your own university's applications")
     
-    university = await db.universities.find_one({"id": university_id}, {"_id": 0})
+    university = await db.universities.find_one({"id": university_id}, {"_id": 0, "name": 1})
     if not university:
         raise HTTPException(status_code=404, detail="University not found")
     
-    applications = await db.applications.find({"university_id": university_id}, {"_id": 0}).to_list(10000)
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Applications"
-    
-    headers = ['Name', 'Email', 'Phone', 'University Name', 'Course Interest', 'Short Note', 'Date', 'Status']
-    ws.append(headers)
-    
-    header_fill = PatternFill(start_color="EA580C", end_color="EA580C", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-    
-    for app in applications:
-        created_date = datetime.fromisoformat(app['created_at']).strftime('%Y-%m-%d %H:%M')
-        ws.append([
-            app['name'],
-            app['email'],
-            app['phone'],
-            app['university_name'],
-            app['course_interest'],
-            app['short_note'],
-            created_date,
-            app['status']
-        ])
-    
-    for column in ws.columns:
-        max_length = 0
-        column = list(column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(cell.value)
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column[0].column_letter].width = adjusted_width
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
     uni_name = university['name'].replace(' ', '_')
-    filename = f"{uni_name}_applications.xlsx"
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    query = application_filter_query(status, course_interest, date_from, date_to)
+    if not query:
+        return await export_snapshot_response(request, university_id, format, f"{uni_name}_applications")
+    query['university_id'] = university_id
+    
+    output, writer_class = await export_applications(query, format)
+    return file_download_response(output, f"{uni_name}_applications.{writer_class.extension}", writer_class.media_type)
+
+# ============ APPLICATION COUNTERS ============
+
+# `application_counters` holds {total, by_status} per university id, plus one
+# document for all applications under ALL_APPLICATIONS_SCOPE. Application
+# writes $inc them, so stats never scan applications. A write that fails
+# between the application and its counters leaves them off by one until
+# reconcile_application_counters() (startup, or migrate.py) recounts.
+async def count_applications(university_id: str, status_counts: Dict[str, int]):
+    status_counts = {status: delta for status, delta in status_counts.items() if delta}
+    if not status_counts:
+        return
+    inc = {f"by_status.{status}": delta for status, delta in status_counts.items()}
+    inc['total'] = sum(status_counts.values())
+    await db.application_counters.bulk_write([
+        UpdateOne({"_id": scope}, {"$inc": inc}, upsert=True)
+        for scope in (university_id, ALL_APPLICATIONS_SCOPE)
+    ], ordered=False)
+
+async def reconcile_application_counters() -> int:
+    """Recount every university's counters from the applications themselves."""
+    counters = {ALL_APPLICATIONS_SCOPE: {"total": 0, "by_status": {}}}
+    async for group in db.applications.aggregate([
+        {"$group": {"_id": {"university_id": "$university_id", "status": "$status"}, "count": {"$sum": 1}}}
+    ]):
+        status = group['_id'].get('status') or 'pending'
+        scopes = [ALL_APPLICATIONS_SCOPE]
+        if group['_id'].get('university_id'):
+            scopes.append(group['_id']['university_id'])
+        for scope in scopes:
+            counter = counters.setdefault(scope, {"total": 0, "by_status": {}})
+            counter['total'] += group['count']
+            counter['by_status'][status] = counter['by_status'].get(status, 0) + group['count']
+    await db.application_counters.bulk_write(
+        [ReplaceOne({"_id": scope}, counter, upsert=True) for scope, counter in counters.items()],
+        ordered=False
     )
+    await db.application_counters.delete_many({"_id": {"$nin": list(counters)}})
+    return len(counters) - 1
+
+async def ensure_application_counters():
+    """Build the counters once if they have never been computed."""
+    if not await db.application_counters.find_one({"_id": ALL_APPLICATIONS_SCOPE}):
+        universities = await reconcile_application_counters()
+        logger.info(f"Built application counters for {universities} universities")
+
+async def get_application_counters(scope: str) -> Dict[str, Any]:
+    counter = await db.application_counters.find_one({"_id": scope}) or {}
+    return {"total": counter.get('total', 0), "by_status": counter.get('by_status', {})}
+
+@api_router.get("/universities/{university_id}/application-stats")
+async def get_university_application_stats(university_id: str, current_user: Principal = Depends(get_current_user)):
+    """Application counts for one university, in total and per status."""
+    if current_user.role not in ['admin', 'manager']:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    if current_user.role == 'manager' and current_user.university_id != university_id:
+        raise HTTPException(status_code=403, detail="You can only view your own university's stats")
+    
+    return {"university_id": university_id, **await get_application_counters(university_id)}
 
 # ============ APPLICATION ENDPOINTS ============
 
 @api_router.post("/applications", response_model=ApplicationResponse)
-async def create_application(application_data: ApplicationCreate):
+async def create_application(application_data: ApplicationCreate, http_request: Request):
+    await enforce_rate_limit("create_application", http_request, application_data.email)
     application = Application(**application_data.model_dump())
     await db.applications.insert_one(application.model_dump())
+    await applications_changed(application.university_id, {application.status: 1})
     return ApplicationResponse(**application.model_dump())
 
-@api_router.get("/applications", response_model=List[ApplicationResponse])
-async def get_applications(current_user: Dict = Depends(get_current_user)):
-    query = {}
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class DocumentJSONResponse(JSONResponse):
+    """JSONResponse for raw Mongo documents: only datetimes need converting,
+    which json.dumps does as it goes instead of a jsonable_encoder pass."""
+
+    def render(self, content) -> bytes:
+        return json.dumps(content, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+APPLICATION_PROJECTION = {"_id": 0, **{field: 1 for field in ApplicationResponse.model_fields}}
+APPLICATION_SEARCH_FIELDS = ('name', 'email', 'phone')
+MAX_UNPAGED_APPLICATIONS = 10000
+
+async def list_applications(
+    query: Dict,
+    search: Optional[str],
+    limit: Optional[int],
+    cursor: Optional[str],
+    include_total: bool,
+) -> DocumentJSONResponse:
+    """Matching applications as plain JSON rows.
+
+    Rows are projected to the ApplicationResponse fields and serialized as
+    they come from Mongo rather than through one model per row. Passing
+    `limit` or `cursor` returns an `ApplicationPage`, newest first and paged
+    by (created_at, id); without them the full list is returned as before.
+    """
+    if search:
+        pattern = {'$regex': re.escape(search), '$options': 'i'}
+        query['$or'] = [{field: pattern} for field in APPLICATION_SEARCH_FIELDS]
+    
+    if limit is None and cursor is None:
+        applications = await db.applications.find(query, APPLICATION_PROJECTION).to_list(MAX_UNPAGED_APPLICATIONS)
+        return DocumentJSONResponse(applications)
+    
+    find_query = query
+    if cursor:
+        position = decode_cursor(cursor)
+        if 'created_at' not in position or 'id' not in position:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = keyset_filter('created_at', position['created_at'], position['id'], descending=True)
+        find_query = {'$and': [query, after]} if query else after
+    
+    # The created_at indexes (alone or after university_id/status) give the
+    # sort order, so the scan stops once a page of matches has been found
+    page_size = limit or MAX_PAGE_SIZE
+    page_query = db.applications.find(find_query, APPLICATION_PROJECTION).sort(
+        [('created_at', DESCENDING), ('id', DESCENDING)]
+    ).limit(page_size + 1)
+    if include_total:
+        applications, total = await asyncio.gather(page_query.to_list(None), db.applications.count_documents(query))
+    else:
+        applications, total = await page_query.to_list(None), None
+    
+    next_cursor = None
+    if len(applications) > page_size:
+        applications = applications[:page_size]
+        last = applications[-1]
+        next_cursor = encode_cursor({'created_at': last['created_at'], 'id': last['id']})
+    return DocumentJSONResponse({"items": applications, "next_cursor": next_cursor, "total": total})
+
+@api_router.get("/applications", response_model=Union[List[ApplicationResponse], ApplicationPage])
+async def get_applications(
+    status: Optional[str] = None,
+    course_interest: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: Principal = Depends(get_current_user)
+):
+    """List applications, filtered by status, course, creation date and a
+    `search` over name, email and phone. See `list_applications` for paging."""
+    query = application_filter_query(status, course_interest, date_from, date_to)
     
-    if current_user['role'] == 'manager':
-        if not current_user.get('university_id'):
+    if current_user.role == 'manager':
+        if not current_user.university_id:
             raise HTTPException(status_code=403, detail="No university assigned")
-        query['university_id'] = current_user['university_id']
+        query['university_id'] = current_user.university_id
     
-    if current_user['role'] == 'student':
+    if current_user.role == 'student':
         raise HTTPException(status_code=403, detail="Unauthorized")
     
-    applications = await db.applications.find(query, {"_id": 0}).to_list(10000)
-    return [ApplicationResponse(**app) for app in applications]
+    return await list_applications(query, search, limit, cursor, include_total)
 
-@api_router.get("/applications/university/{university_id}", response_model=List[ApplicationResponse])
-async def get_applications_by_university(university_id: str, current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] == 'manager' and current_user.get('university_id') != university_id:
+@api_router.get("/applications/university/{university_id}", response_model=Union[List[ApplicationResponse], ApplicationPage])
+async def get_applications_by_university(
+    university_id: str,
+    status: Optional[str] = None,
+    course_interest: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role == 'manager' and current_user.university_id != university_id:
         raise HTTPException(status_code=403, detail="You can only view your own university's applications")
     
-    if current_user['role'] not in ['admin', 'manager']:
+    if current_user.role not in ['admin', 'manager']:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
-    applications = await db.applications.find({"university_id": university_id}, {"_id": 0}).to_list(10000)
-    return [ApplicationResponse(**app) for app in applications]
+    query = application_filter_query(status, course_interest, date_from, date_to)
+    query['university_id'] = university_id
+    return await list_applications(query, search, limit, cursor, include_total)
 
 @api_router.put("/applications/{application_id}/status")
 async def update_application_status(
     application_id: str,
-    status: str,
-    current_user: Dict = Depends(get_current_user)
+    status: str = Query(..., pattern='^[A-Za-z_-]+$'),
+    current_user: Principal = Depends(get_current_user)
 ):
-    if current_user['role'] not in ['admin', 'manager']:
+    if current_user.role not in ['admin', 'manager']:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
     application = await db.applications.find_one({"id": application_id}, {"_id": 0})
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
-    if current_user['role'] == 'manager' and application['university_id'] != current_user.get('university_id'):
+    if current_user.role == 'manager' and application['university_id'] != current_user.university_id:
         raise HTTPException(status_code=403, detail="You can only update your own university's applications")
     
-    await db.applications.update_one(
+    # The status returned here is the one this update replaced, even under concurrent updates
+    previous = await db.applications.find_one_and_update(
         {"id": application_id},
-        {"$set": {"status": status}}
+        {"$set": {"status": status}},
+        projection={"_id": 0, "status": 1}
     )
+    if not previous:
+        raise HTTPException(status_code=404, detail="Application not found")
+    if previous.get('status') != status:
+        await applications_changed(application['university_id'], {previous.get('status') or 'pending': -1, status: 1})
     
     return {"message": "Status updated"}
 
 @api_router.delete("/applications/{application_id}")
-async def delete_application(application_id: str, current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] not in ['admin', 'manager']:
+async def delete_application(application_id: str, current_user: Principal = Depends(get_current_user)):
+    if current_user.role not in ['admin', 'manager']:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
     application = await db.applications.find_one({"id": application_id}, {"_id": 0})
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
-    if current_user['role'] == 'manager' and application['university_id'] != current_user.get('university_id'):
+    if current_user.role == 'manager' and application['university_id'] != current_user.university_id:
         raise HTTPException(status_code=403, detail="You can only delete your own university's applications")
     
-    await db.applications.delete_one({"id": application_id})
+    deleted = await db.applications.find_one_and_delete({"id": application_id}, projection={"_id": 0, "status": 1})
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Application not found")
+    await applications_changed(application['university_id'], {deleted.get('status') or 'pending': -1})
     
     return {"message": "Application deleted"}
 
-# ============ EXCEL EXPORT ENDPOINT ============
+# ============ EXPORT ENDPOINTS ============
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_BATCH_SIZE = 1000
+EXPORT_STREAM_CHUNK = 256 * 1024
+EXPORT_MAX_COLUMN_WIDTH = 50
+EXPORT_DATE_FORMAT = '%Y-%m-%d %H:%M'
+
+# (header, application field) in export column order
+APPLICATION_EXPORT_COLUMNS = [
+    ('Name', 'name'),
+    ('Email', 'email'),
+    ('Phone', 'phone'),
+    ('University Name', 'university_name'),
+    ('Course Interest', 'course_interest'),
+    ('Short Note', 'short_note'),
+    ('Date', 'created_at'),
+    ('Status', 'status'),
+]
+
+def format_export_date(value: Union[datetime, str, None]) -> str:
+    # Applications `migrate.py datetimes` has not converted yet still hold ISO strings
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value.strftime(EXPORT_DATE_FORMAT) if value else ''
+
+def application_export_row(app: Dict) -> List:
+    return [
+        format_export_date(app.get(field)) if field == 'created_at' else app.get(field, '')
+        for _, field in APPLICATION_EXPORT_COLUMNS
+    ]
+
+async def application_column_widths(query: Dict, collection=None) -> List[float]:
+    """Widest value per export column, computed by Mongo in one $group pass."""
+    collection = db.applications if collection is None else collection
+    text_fields = [field for _, field in APPLICATION_EXPORT_COLUMNS if field != 'created_at']
+    group = {"_id": None}
+    for field in text_fields:
+        group[field] = {"$max": {"$strLenCP": {"$toString": {"$ifNull": [f"${field}", ""]}}}}
+    stats = await collection.aggregate([{"$match": query}, {"$group": group}]).to_list(1)
+    longest = stats[0] if stats else {}
+    widths = []
+    for header, field in APPLICATION_EXPORT_COLUMNS:
+        value_length = len(EXPORT_DATE_FORMAT.replace('%Y', '0000')) if field == 'created_at' else (longest.get(field) or 0)
+        widths.append(min(max(len(header), value_length) + 2, EXPORT_MAX_COLUMN_WIDTH))
+    return widths
+
+class ExportWriter:
+    """Writes export rows in one file format into a spooled temp file.
+
+    Every method blocks and is called from a worker thread.
+    """
+    media_type = "application/octet-stream"
+    extension = ""
+    needs_column_widths = False
+
+    def __init__(self, columns: List[tuple], widths: Optional[List[float]] = None):
+        self.columns = columns
+        self.output = tempfile.SpooledTemporaryFile(max_size=EXPORT_STREAM_CHUNK * 4)
+
+    def write_rows(self, rows: List[List]):
+        raise NotImplementedError
+
+    def finish(self):
+        self.output.seek(0)
+        return self.output
+
+class XlsxExportWriter(ExportWriter):
+    media_type = XLSX_MEDIA_TYPE
+    extension = "xlsx"
+    needs_column_widths = True
+
+    def __init__(self, columns, widths=None):
+        super().__init__(columns, widths)
+        # Write-only sheets need column widths before the first row
+        self.wb = Workbook(write_only=True)
+        self.ws = self.wb.create_sheet(title="Applications")
+        for i, width in enumerate(widths or [], start=1):
+            self.ws.column_dimensions[get_column_letter(i)].width = width
+        
+        header_fill = PatternFill(start_color="EA580C", end_color="EA580C", fill_type="solid")
+        header_font = Font(bold=True, color="FFFFFF")
+        header_alignment = Alignment(horizontal='center', vertical='center')
+        header_row = []
+        for header, _ in columns:
+            cell = WriteOnlyCell(self.ws, value=header)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = header_alignment
+            header_row.append(cell)
+        self.ws.append(header_row)
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.ws.append(row)
+
+    def finish(self):
+        self.wb.save(self.output)
+        return super().finish()
+
+class CsvExportWriter(ExportWriter):
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, columns, widths=None):
+        super().__init__(columns, widths)
+        # utf-8-sig so Excel picks the right encoding when opening the file
+        self.text = io.TextIOWrapper(self.output, encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(self.text)
+        self.writer.writerow([header for header, _ in columns])
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def finish(self):
+        self.text.flush()
+        self.text.detach()
+        return super().finish()
+
+class NdjsonExportWriter(ExportWriter):
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def write_rows(self, rows):
+        fields = [field for _, field in self.columns]
+        self.output.write(b"".join(
+            json.dumps(dict(zip(fields, row)), ensure_ascii=False).encode('utf-8') + b"\n"
+            for row in rows
+        ))
+
+EXPORT_WRITERS = {
+    "xlsx": XlsxExportWriter,
+    "csv": CsvExportWriter,
+    "ndjson": NdjsonExportWriter,
+}
+
+async def export_applications(query: Dict, export_format: str = "xlsx", collection=None):
+    """Stream matching applications into an export file and return (file, writer class).
+
+    The Mongo cursor is read in EXPORT_BATCH_SIZE batches and the writer runs
+    in a worker thread, so neither memory nor the event loop scale with the
+    number of applications.
+    """
+    collection = db.applications if collection is None else collection
+    writer_class = EXPORT_WRITERS[export_format]
+    widths = await application_column_widths(query, collection) if writer_class.needs_column_widths else None
+    writer = await run_in_threadpool(writer_class, APPLICATION_EXPORT_COLUMNS, widths)
+    projection = {"_id": 0, **{field: 1 for _, field in APPLICATION_EXPORT_COLUMNS}}
+    cursor = collection.find(query, projection).batch_size(EXPORT_BATCH_SIZE)
+    while True:
+        batch = await cursor.to_list(EXPORT_BATCH_SIZE)
+        if not batch:
+            break
+        await run_in_threadpool(writer.write_rows, [application_export_row(app) for app in batch])
+    return await run_in_threadpool(writer.finish), writer_class
+
+def application_filter_query(
+    status: Optional[str] = None,
+    course_interest: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> Dict:
+    """Mongo filter for the optional application filters shared by exports and listings."""
+    query = {}
+    if status:
+        query['status'] = status
+    if course_interest:
+        query['course_interest'] = {'$regex': re.escape(course_interest), '$options': 'i'}
+    created_at = {}
+    for op, value in (('$gte', date_from), ('$lte', date_to)):
+        if not value:
+            continue
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid date: {value}")
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        if op == '$lte' and len(value) == 10:
+            parsed += timedelta(days=1) - timedelta(microseconds=1)  # whole day for a bare date
+        created_at[op] = parsed
+    if created_at:
+        query['created_at'] = created_at
+    return query
+
+def file_download_response(output, filename: str, media_type: str) -> StreamingResponse:
+    """Stream an open temp file as an attachment and close it afterwards."""
+    size = output.seek(0, io.SEEK_END)
+    output.seek(0)
+    
+    def chunks():
+        with output:
+            while True:
+                chunk = output.read(EXPORT_STREAM_CHUNK)
+                if not chunk:
+                    break
+                yield chunk
+    
+    return StreamingResponse(
+        chunks(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(size),
+        }
+    )
+
+# ============ EXPORT SNAPSHOTS ============
+
+# Unfiltered exports are kept on disk per (scope, format), where the scope is a
+# university id or ALL_APPLICATIONS_SCOPE. A snapshot is reused while the
+# `applications:<university_id>` (or `applications`) version it was built from
+# is still current, so repeat downloads stream the file instead of rebuilding
+# it. The refresher rebuilds stale xlsx snapshots in the background; on each
+# host only the worker holding the refresher lease runs it.
+#
+# A replaced snapshot file stays on disk for EXPORT_SNAPSHOT_GRACE_SECONDS:
+# downloads (in this or another worker) may be about to stream it.
+ALL_APPLICATIONS_SCOPE = "all"
+EXPORT_SNAPSHOT_DIR = Path(os.environ.get('EXPORT_SNAPSHOT_DIR', Path(tempfile.gettempdir()) / 'edudham-exports'))
+EXPORT_SNAPSHOT_INTERVAL_SECONDS = float(os.environ.get('EXPORT_SNAPSHOT_INTERVAL_SECONDS', '300'))  # 0 disables the refresher
+EXPORT_SNAPSHOT_GRACE_SECONDS = 600
+_export_snapshot_locks: Dict[str, asyncio.Lock] = {}
+_export_snapshot_refresher = None
+
+def export_snapshot_version_key(scope: str) -> str:
+    return "applications" if scope == ALL_APPLICATIONS_SCOPE else f"applications:{scope}"
+
+def export_snapshot_name(scope: str, export_format: str) -> str:
+    return f"{re.sub(r'[^A-Za-z0-9_-]', '_', scope)}.{export_format}"
+
+def read_export_snapshot(scope: str, export_format: str) -> Optional[Dict]:
+    """Manifest of the snapshot on disk, or None if it is missing."""
+    try:
+        manifest = json.loads((EXPORT_SNAPSHOT_DIR / f"{export_snapshot_name(scope, export_format)}.json").read_text())
+    except (OSError, ValueError):
+        return None
+    return manifest if (EXPORT_SNAPSHOT_DIR / manifest['file']).exists() else None
+
+def write_export_snapshot(scope: str, export_format: str, version: int, output) -> Dict:
+    """Move a finished export into the snapshot directory under its content hash."""
+    EXPORT_SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    name = export_snapshot_name(scope, export_format)
+    digest = hashlib.sha256()
+    with output, tempfile.NamedTemporaryFile(dir=EXPORT_SNAPSHOT_DIR, delete=False) as tmp:
+        while True:
+            chunk = output.read(EXPORT_STREAM_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+            tmp.write(chunk)
+    manifest = {
+        "version": version,
+        "sha256": digest.hexdigest(),
+        "file": f"{name}.{digest.hexdigest()[:16]}",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    previous = read_export_snapshot(scope, export_format)
+    os.replace(tmp.name, EXPORT_SNAPSHOT_DIR / manifest['file'])
+    # Write-then-rename so readers never see a half-written manifest
+    with tempfile.NamedTemporaryFile('w', dir=EXPORT_SNAPSHOT_DIR, delete=False) as tmp:
+        json.dump(manifest, tmp)
+    os.replace(tmp.name, EXPORT_SNAPSHOT_DIR / f"{name}.json")
+    if previous and previous['file'] != manifest['file']:
+        # The grace period counts from now, not from when the file was built
+        try:
+            os.utime(EXPORT_SNAPSHOT_DIR / previous['file'])
+        except FileNotFoundError:
+            pass
+    prune_export_snapshots()
+    return manifest
+
+def prune_export_snapshots():
+    """Delete files no manifest points to once they are older than the grace period."""
+    referenced = set()
+    for manifest_path in EXPORT_SNAPSHOT_DIR.glob("*.json"):
+        try:
+            referenced.add(json.loads(manifest_path.read_text())['file'])
+        except (OSError, ValueError, KeyError):
+            continue
+    cutoff = time.time() - EXPORT_SNAPSHOT_GRACE_SECONDS
+    for path in EXPORT_SNAPSHOT_DIR.iterdir():
+        if path.suffix == '.json' or path.name in referenced:
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            continue  # removed by another worker meanwhile
+
+async def current_export_snapshot(scope: str, export_format: str) -> Dict:
+    """Snapshot manifest for the scope, rebuilding the file if applications changed since."""
+    version_key = export_snapshot_version_key(scope)
+    # From the primary: a lagging version would pass an outdated snapshot as current
+    version = (await get_collection_versions([version_key], db))[version_key]
+    lock = _export_snapshot_locks.setdefault(f"{scope}:{export_format}", asyncio.Lock())
+    async with lock:
+        manifest = await run_in_threadpool(read_export_snapshot, scope, export_format)
+        if manifest is None or manifest['version'] != version:
+            query = {} if scope == ALL_APPLICATIONS_SCOPE else {"university_id": scope}
+            output, _ = await export_applications(query, export_format)
+            manifest = await run_in_threadpool(write_export_snapshot, scope, export_format, version, output)
+    return manifest
+
+async def export_snapshot_response(
+    request: Request, scope: str, export_format: str, filename: str
+) -> Response:
+    manifest = await current_export_snapshot(scope, export_format)
+    writer_class = EXPORT_WRITERS[export_format]
+    etag = f'"{manifest["sha256"]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get('if-none-match', ''):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        EXPORT_SNAPSHOT_DIR / manifest['file'],
+        media_type=writer_class.media_type,
+        filename=f"{filename}.{writer_class.extension}",
+        headers=headers,
+    )
+
+async def refresh_export_snapshots():
+    """Rebuild the stale xlsx snapshots of every scope that has applications."""
+    scopes = [ALL_APPLICATIONS_SCOPE] + await db.applications.distinct("university_id")
+    for scope in scopes:
+        await current_export_snapshot(scope, "xlsx")
+
+async def export_snapshot_refresher():
+    # Snapshots live on local disk, so the lease is per host. It is held for one
+    # interval and not released: the first worker to wake after it expires runs
+    # the next pass, the others skip theirs.
+    lease = f"export-snapshots:{socket.gethostname()}"
+    while True:
+        await asyncio.sleep(EXPORT_SNAPSHOT_INTERVAL_SECONDS)
+        try:
+            if await acquire_lease(lease, EXPORT_SNAPSHOT_INTERVAL_SECONDS):
+                await refresh_export_snapshots()
+                await run_in_threadpool(prune_export_snapshots)
+        except Exception:
+            logger.exception("Refreshing export snapshots failed")
+
+def start_export_snapshot_refresher():
+    global _export_snapshot_refresher
+    if EXPORT_SNAPSHOT_INTERVAL_SECONDS > 0:
+        _export_snapshot_refresher = asyncio.create_task(export_snapshot_refresher())
+
+async def stop_export_snapshot_refresher():
+    if _export_snapshot_refresher:
+        _export_snapshot_refresher.cancel()
+        await asyncio.gather(_export_snapshot_refresher, return_exceptions=True)
 
 @api_router.get("/applications/export/excel")
-async def export_applications_excel(current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] not in ['admin', 'manager']:
+async def export_applications_excel(
+    request: Request,
+    format: str = Query('xlsx', pattern='^(xlsx|csv|ndjson)$'),
+    status: Optional[str] = None,
+    course_interest: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role not in ['admin', 'manager']:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
-    query = {}
-    filename = "all_applications.xlsx"
+    query = application_filter_query(status, course_interest, date_from, date_to)
+    filtered = bool(query)
+    scope = ALL_APPLICATIONS_SCOPE
+    filename = "all_applications"
     
-    if current_user['role'] == 'manager':
-        if not current_user.get('university_id'):
+    if current_user.role == 'manager':
+        if not current_user.university_id:
             raise HTTPException(status_code=403, detail="No university assigned")
-        query['university_id'] = current_user['university_id']
+        query['university_id'] = scope = current_user.university_id
         
-        university = await db.universities.find_one({"id": current_user['university_id']}, {"_id": 0})
+        university = await db.universities.find_one({"id": current_user.university_id}, {"_id": 0, "name": 1})
         if university:
             uni_name = university['name'].replace(' ', '_')
-            filename = f"{uni_name}_applications.xlsx"
-    
-    applications = await db.applications.find(query, {"_id": 0}).to_list(10000)
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Applications"
-    
-    headers = ['Name', 'Email', 'Phone', 'University Name', 'Course Interest', 'Short Note', 'Date', 'Status']
-    ws.append(headers)
-    
-    header_fill = PatternFill(start_color="EA580C", end_color="EA580C", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center')
+            filename = f"{uni_name}_applications"
     
-    for app in applications:
-        created_date = datetime.fromisoformat(app['created_at']).strftime('%Y-%m-%d %H:%M')
-        ws.append([
-            app['name'],
-            app['email'],
-            app['phone'],
-            app['university_name'],
-            app['course_interest'],
-            app['short_note'],
-            created_date,
-            app['status']
-        ])
-    
-    for column in ws.columns:
-        max_length = 0
-        column = list(column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(cell.value)
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column[0].column_letter].width = adjusted_width
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    if not filtered:
+        return await export_snapshot_response(request, scope, format, filename)
+    output, writer_class = await export_applications(query, format)
+    return file_download_response(output, f"{filename}.{writer_class.extension}", writer_class.media_type)
 
 # ============ ADMIN ENDPOINTS ============
 
+ADMIN_STATS_TREND_DAYS = 30
+ADMIN_STATS_TOP_N = 10
+
+def count_by(field: str, top: Optional[int] = None) -> List[Dict]:
+    """$facet branch counting documents per value of `field`, largest first."""
+    stages = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}, {"$sort": {"count": -1, "_id": 1}}]
+    return stages + [{"$limit": top}] if top else stages
+
+def facet_counts(groups: List[Dict]) -> Dict[str, int]:
+    return {str(group['_id']): group['count'] for group in groups}
+
+async def facet_stats(collection, facets: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """Run several aggregations over one collection in a single $facet pass."""
+    result = await collection.aggregate([{"$facet": facets}]).to_list(1)
+    return result[0] if result else {name: [] for name in facets}
+
+async def application_facets() -> Dict[str, Any]:
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    since = today - timedelta(days=ADMIN_STATS_TREND_DAYS)
+    facets = await facet_stats(db.applications, {
+        "total": [{"$count": "count"}],
+        "by_status": count_by("status"),
+        "by_university": [
+            {"$group": {"_id": "$university_id", "university_name": {"$first": "$university_name"}, "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": ADMIN_STATS_TOP_N},
+        ],
+        "daily": [
+            {"$match": {"created_at": {"$gte": since}}},
+            {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}, "count": {"$sum": 1}}},
+            {"$sort": {"_id": 1}},
+        ],
+        "top_courses": count_by("course_interest", ADMIN_STATS_TOP_N),
+    })
+    return {
+        "total": facets['total'][0]['count'] if facets['total'] else 0,
+        "by_status": facet_counts(facets['by_status']),
+        "by_university": [
+            {"university_id": group['_id'], "university_name": group.get('university_name'), "count": group['count']}
+            for group in facets['by_university']
+        ],
+        "daily": [{"date": group['_id'], "count": group['count']} for group in facets['daily']],
+        "top_courses": [{"course": group['_id'], "count": group['count']} for group in facets['top_courses']],
+    }
+
+async def university_facets() -> Dict[str, Any]:
+    facets = await facet_stats(db.universities, {
+        "total": [{"$count": "count"}],
+        "by_category": [{"$unwind": "$university_categories"}] + count_by("university_categories", ADMIN_STATS_TOP_N),
+    })
+    return {
+        "total": facets['total'][0]['count'] if facets['total'] else 0,
+        "by_category": facet_counts(facets['by_category']),
+    }
+
+async def user_facets() -> Dict[str, Any]:
+    facets = await facet_stats(db.users, {"by_role": count_by("role")})
+    return {"by_role": facet_counts(facets['by_role'])}
+
 @api_router.get("/admin/stats")
-async def get_admin_stats(current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] != 'admin':
+async def get_admin_stats(summary: bool = False, current_user: Principal = Depends(get_current_user)):
+    """Dashboard statistics: one $facet aggregation per collection, run concurrently.
+
+    The flat totals are kept for the existing dashboard cards. `summary=true`
+    returns only those, read from the application counters and indexed
+    counts, without the aggregations; the dashboard cards use it.
+    """
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin only")
     
-    total_universities = await db.universities.count_documents({})
-    total_applications = await db.applications.count_documents({})
-    total_managers = await db.users.count_documents({"role": "manager"})
-    pending_applications = await db.applications.count_documents({"status": "pending"})
+    if summary:
+        counters, total_universities, total_managers = await asyncio.gather(
+            get_application_counters(ALL_APPLICATIONS_SCOPE),
+            db.universities.estimated_document_count(),
+            db.users.count_documents({"role": "manager"}),
+        )
+        return {
+            "total_universities": total_universities,
+            "total_applications": counters['total'],
+            "total_managers": total_managers,
+            "pending_applications": counters['by_status'].get('pending', 0),
+        }
+    
+    applications, universities, users = await asyncio.gather(
+        application_facets(), university_facets(), user_facets()
+    )
     
     return {
-        "total_universities": total_universities,
-        "total_applications": total_applications,
-        "total_managers": total_managers,
-        "pending_applications": pending_applications
+        "total_universities": universities['total'],
+        "total_applications": applications['total'],
+        "total_managers": users['by_role'].get('manager', 0),
+        "pending_applications": applications['by_status'].get('pending', 0),
+        "applications": applications,
+        "universities": universities,
+        "users": users,
     }
 
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+@api_router.get("/metrics")
+async def get_metrics(request: Request):
+    """Prometheus text metrics for this worker's MongoDB connection pool.
+
+    Disabled (404) unless METRICS_TOKEN is set; the token must then be sent
+    as a bearer token. Each worker reports its own pool, labelled by pid.
+    """
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get('authorization', ''), f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    labels = f'{{pid="{os.getpid()}"}}'
+    max_pool_size = client.options.pool_options.max_pool_size
+    metrics = [
+        ("mongo_pool_max_size", "gauge", "Configured maxPoolSize", max_pool_size),
+        ("mongo_pool_open_connections", "gauge", "Open connections", pool_metrics.open),
+        ("mongo_pool_checked_out_connections", "gauge", "Connections in use", pool_metrics.checked_out),
+        ("mongo_pool_utilization", "gauge", "Connections in use / maxPoolSize", pool_metrics.checked_out / max_pool_size if max_pool_size else 0),
+        ("mongo_pool_waiting_operations", "gauge", "Operations waiting for a connection", pool_metrics.waiting),
+        ("mongo_pool_checkouts_total", "counter", "Connection checkouts", pool_metrics.checkouts),
+        ("mongo_pool_checkout_failures_total", "counter", "Failed checkouts (timeouts, errors)", pool_metrics.checkout_failures),
+        ("mongo_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for connections", pool_metrics.checkout_wait_seconds),
+        ("mongo_pool_clears_total", "counter", "Pool clears after network errors", pool_metrics.pool_clears),
+    ]
+    lines = []
+    for name, kind, help_text, value in metrics:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name}{labels} {value}"]
+    return Response("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+@api_router.get("/admin/cache-stats")
+async def get_cache_stats(current_user: Principal = Depends(get_current_user)):
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin only")
+    return {**response_cache.stats(), "principals": principal_cache.stats()}
+
 @api_router.post("/admin/users", response_model=UserResponse)
-async def create_user(user_data: UserCreate, current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] != 'admin':
+async def create_user(user_data: UserCreate, current_user: Principal = Depends(get_current_user)):
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin only")
     
     existing = await db.users.find_one({"email": user_data.email}, {"_id": 0})
@@ -1067,7 +3055,7 @@ async def create_user(user_data: UserCreate, current_user: Dict = Depends(get_cu
     
     user = User(
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=await hash_password(user_data.password),
         name=user_data.name,
         role=user_data.role,
         university_id=user_data.university_id
@@ -1084,8 +3072,8 @@ async def create_user(user_data: UserCreate, current_user: Dict = Depends(get_cu
     )
 
 @api_router.get("/admin/users", response_model=List[UserResponse])
-async def get_all_users(current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] != 'admin':
+async def get_all_users(current_user: Principal = Depends(get_current_user)):
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin only")
     
     users = await db.users.find({}, {"_id": 0, "password_hash": 0}).to_list(1000)
@@ -1098,9 +3086,9 @@ async def update_user(
     email: Optional[str] = None,
     password: Optional[str] = None,
     university_id: Optional[str] = None,
-    current_user: Dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    if current_user['role'] != 'admin':
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin only")
     
     update_data = {}
@@ -1112,7 +3100,7 @@ async def update_user(
             raise HTTPException(status_code=400, detail="Email already in use")
         update_data['email'] = email
     if password:
-        update_data['password_hash'] = hash_password(password)
+        update_data['password_hash'] = await hash_password(password)
     if university_id is not None:
         update_data['university_id'] = university_id
     
@@ -1122,26 +3110,67 @@ async def update_user(
     result = await db.users.update_one({"id": user_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    # Tokens carry the email and university; a new password should sign everyone out
+    if update_data.keys() & {'email', 'password_hash', 'university_id'}:
+        await revoke_user_tokens(user_id)
     
     return {"message": "User updated successfully"}
 
 @api_router.delete("/admin/users/{user_id}")
-async def delete_user(user_id: str, current_user: Dict = Depends(get_current_user)):
-    if current_user['role'] != 'admin':
+async def delete_user(user_id: str, current_user: Principal = Depends(get_current_user)):
+    if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin only")
     
-    if user_id == current_user['user_id']:
+    if user_id == current_user.user_id:
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
     result = await db.users.delete_one({"id": user_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    await revoke_user_tokens(user_id)
     
     return {"message": "User deleted successfully"}
 
 # Include router
 app.include_router(api_router)
 
+# Public read endpoints that answer conditional GETs: (path, collections, Cache-Control).
+# "no-cache" lets browsers and the CDN keep a copy but revalidate every time,
+# which is a cheap 304 while nothing changed.
+CONDITIONAL_ROUTES = [
+    (re.compile(r"^/api/homepage-config$"), ("homepage_config",), "public, no-cache"),
+    (re.compile(r"^/api/categories$"), ("categories",), "public, no-cache"),
+    (re.compile(r"^/api/universities/filter-options$"), ("universities", "categories"), "public, no-cache"),
+    (re.compile(r"^/api/universities$"), ("universities",), "public, no-cache"),
+    (re.compile(r"^/api/universities/[^/]+$"), ("universities",), "public, no-cache"),
+]
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """Answer If-None-Match with 304 before the endpoint runs, using collection versions."""
+    if request.method not in ("GET", "HEAD"):
+        return await call_next(request)
+    route = next((r for r in CONDITIONAL_ROUTES if r[0].match(request.url.path)), None)
+    if route is None:
+        return await call_next(request)
+    
+    _, collections, cache_control = route
+    versions = await get_collection_versions(collections)
+    validator = f"{request.url.path}?{request.url.query}|" + ",".join(f"{c}:{versions[c]}" for c in collections)
+    if CATALOG_ETAG_ROTATION_SECONDS:
+        validator += f"|{int(time.time() // CATALOG_ETAG_ROTATION_SECONDS)}"
+    etag = '"' + hashlib.sha1(validator.encode('utf-8')).hexdigest() + '"'
+    
+    if_none_match = request.headers.get('if-none-match', '')
+    if etag in if_none_match:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = cache_control
+    return response
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -1156,25 +3185,84 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("startup")
-async def startup_db_client():
-    """On startup, create the default admin user if no admin exists yet."""
-    existing_admin = await db.users.find_one({"role": "admin"}, {"_id": 0})
-    if not existing_admin:
-        admin_email    = os.environ.get("ADMIN_EMAIL", "admin@edudham.com")
-        admin_password = os.environ.get("ADMIN_PASSWORD", "Admin@123")
-        admin_name     = os.environ.get("ADMIN_NAME", "Admin")
-        admin = User(
-            email=admin_email,
-            password_hash=hash_password(admin_password),
-            name=admin_name,
-            role="admin",
+# ============ STARTUP COORDINATION ============
+
+# Several server processes (gunicorn workers, replicas) start together; the
+# one-time setup below runs in whichever takes the "startup" lease first.
+# The others skip it. A lease left behind by a crashed holder expires after
+# STARTUP_LEASE_SECONDS, and every setup step is idempotent, so running it
+# again later is harmless.
+STARTUP_LEASE_SECONDS = 300
+
+def process_id() -> str:
+    # Not cached at import: a preloaded app is imported before the fork
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+async def acquire_lease(name: str, seconds: int) -> bool:
+    """Take the named lease unless another process holds an unexpired one."""
+    now = datetime.now(timezone.utc)
+    try:
+        await db.leases.update_one(
+            {"_id": name, "expires_at": {"$lte": now}},
+            {"$set": {"holder": process_id(), "expires_at": now + timedelta(seconds=seconds)}},
+            upsert=True
         )
-        await db.users.insert_one(admin.model_dump())
+    except DuplicateKeyError:
+        # The lease exists and is not expired, so the upsert tried to insert a second one
+        return False
+    return True
+
+async def release_lease(name: str):
+    await db.leases.delete_one({"_id": name, "holder": process_id()})
+
+async def seed_default_admin():
+    """Create the default admin if there is no admin yet.
+
+    The insert is an upsert on the email, so two processes seeding at once
+    still end up with one admin.
+    """
+    if await db.users.find_one({"role": "admin"}, {"_id": 1}):
+        logger.info("✅ Admin user already exists — skipping seed.")
+        return
+    admin_email    = os.environ.get("ADMIN_EMAIL", "admin@edudham.com")
+    admin_password = os.environ.get("ADMIN_PASSWORD", "Admin@123")
+    admin_name     = os.environ.get("ADMIN_NAME", "Admin")
+    admin = User(
+        email=admin_email,
+        password_hash=await hash_password(admin_password),
+        name=admin_name,
+        role="admin",
+    )
+    result = await db.users.update_one(
+        {"email": admin_email},
+        {"$setOnInsert": admin.model_dump(exclude={"email"})},
+        upsert=True
+    )
+    if result.upserted_id is not None:
         logger.info(f"✅ Default admin created: {admin_email}")
     else:
-        logger.info("✅ Admin user already exists — skipping seed.")
+        logger.warning(f"A non-admin user already uses {admin_email}; default admin not created")
+
+@app.on_event("startup")
+async def startup_db_client():
+    """On startup, start the background workers; one process also creates missing indexes and the default admin."""
+    if await acquire_lease("startup", STARTUP_LEASE_SECONDS):
+        try:
+            await ensure_indexes()
+            await ensure_application_counters()
+            await seed_default_admin()
+        finally:
+            await release_lease("startup")
+    else:
+        logger.info("Startup tasks are running in another process — skipping.")
+    start_import_workers()
+    start_export_snapshot_refresher()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await stop_import_workers()
+    await stop_export_snapshot_refresher()
+    await drain_background_tasks()
+    image_executor.shutdown(wait=False)
+    password_executor.shutdown(wait=False)
     client.close()
\ No newline at end of file
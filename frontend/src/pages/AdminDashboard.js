@@ -478,7 +478,7 @@ const BulkUploadSection = ({ onSuccess }) => {
               <input
                 ref={bulkFileRef}
                 type="file"
-                accept=".xlsx,.xls"
+                accept=".xlsx,.xls,.csv"
                 style={{ display: 'none' }}
                 onChange={handleBulkFile}
               />
@@ -559,6 +559,7 @@ const UniversitiesTab = () => {
   const [showAddForm, setShowAddForm] = useState(false);
   const [editingUniversity, setEditingUniversity] = useState(null);
   const [expandedDetailsId, setExpandedDetailsId] = useState(null);
+  const [expandedUniversity, setExpandedUniversity] = useState(null);
   const [confirmState, setConfirmState] = useState({ open: false, id: null });
   const [formData, setFormData] = useState({
     name: '',
@@ -632,7 +633,15 @@ const UniversitiesTab = () => {
     }
   };
 
-  const handleEdit = (university) => {
+  // List rows only carry card fields; the forms load the full document
+  const handleEdit = async (listed) => {
+    let university;
+    try {
+      university = await api.getUniversity(listed.id);
+    } catch (error) {
+      toast.error('Failed to load university');
+      return;
+    }
     setEditingUniversity(university);
     setFormData({
       name: university.name,
@@ -650,6 +659,20 @@ const UniversitiesTab = () => {
     window.scrollTo({ top: 0, behavior: 'smooth' });
   };
 
+  const toggleDetails = async (universityId) => {
+    if (expandedDetailsId === universityId) {
+      setExpandedDetailsId(null);
+      return;
+    }
+    setExpandedDetailsId(universityId);
+    setExpandedUniversity(null);
+    try {
+      setExpandedUniversity(await api.getUniversity(universityId));
+    } catch (error) {
+      toast.error('Failed to load university details');
+    }
+  };
+
   const handleDelete = async (universityId) => {
     setConfirmState({ open: true, id: universityId });
   };
@@ -897,9 +920,9 @@ const UniversitiesTab = () => {
                   <React.Fragment key={uni.id}>
                     <TableRow data-testid={`uni-row-${uni.id}`}>
                       <TableCell>
-                        {uni.main_photo ? (
+                        {uni.thumbnail_url ? (
                           <img
-                            src={uni.main_photo}
+                            src={uni.thumbnail_url}
                             alt={uni.name}
                             style={{
                               width: '48px', height: '36px', objectFit: 'cover',
@@ -965,7 +988,7 @@ const UniversitiesTab = () => {
                         <Button
                           size="sm"
                           variant={expandedDetailsId === uni.id ? 'default' : 'outline'}
-                          onClick={() => setExpandedDetailsId(expandedDetailsId === uni.id ? null : uni.id)}
+                          onClick={() => toggleDetails(uni.id)}
                           style={{ gap: '5px', whiteSpace: 'nowrap' }}
                           data-testid={`details-uni-${uni.id}`}
                         >
@@ -989,12 +1012,16 @@ const UniversitiesTab = () => {
                                 Extended Details — {uni.name}
                               </h3>
                             </div>
-                            <UniversityDetailsEditor
-                              universityId={uni.id}
-                              initialData={uni}
-                              onSaved={() => fetchUniversities()}
-                              categories={categories}
-                            />
+                            {expandedUniversity?.id === uni.id ? (
+                              <UniversityDetailsEditor
+                                universityId={uni.id}
+                                initialData={expandedUniversity}
+                                onSaved={() => fetchUniversities()}
+                                categories={categories}
+                              />
+                            ) : (
+                              <p className="text-sm text-muted-foreground">Loading details...</p>
+                            )}
                           </div>
                         </td>
                       </tr>
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo, useRef } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import { Search, MapPin, GraduationCap, TrendingUp, Star, ArrowRight } from 'lucide-react';
 import { Button } from '@/components/ui/button';
@@ -29,10 +29,16 @@ const DEFAULT_HERO = {
   show_footer: false,
 };
 
+const PAGE_SIZE = 12;
+
 const HomePage = () => {
   const { user } = useAuth();
   const [universities, setUniversities] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(0);
+  const [catalogSize, setCatalogSize] = useState(0);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchQuery, setSearchQuery] = useState('');
   const [filters, setFilters] = useState({
     location: '',
@@ -42,6 +48,8 @@ const HomePage = () => {
   const [applyModalOpen, setApplyModalOpen] = useState(false);
   const [selectedUniversity, setSelectedUniversity] = useState(null);
   const universitiesSectionRef = useRef(null);
+  const latestRequest = useRef(0);
+  const currentQuery = useRef({});
 
   // Hero config state — seed from localStorage cache to eliminate flash of default content
   const [heroConfig, setHeroConfig] = useState(() => {
@@ -54,11 +62,17 @@ const HomePage = () => {
   const [currentSlide, setCurrentSlide] = useState(0);
 
   useEffect(() => {
-    fetchUniversities();
     fetchFilterOptions();
     fetchHeroConfig();
   }, []);
 
+  // Live search + filters run on the server, a moment after the last keystroke
+  useEffect(() => {
+    const timeout = setTimeout(() => fetchUniversities(), 300);
+    return () => clearTimeout(timeout);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [searchQuery, filters]);
+
   // Slideshow auto-advance
   useEffect(() => {
     const imgs = heroConfig.background_images;
@@ -97,94 +111,59 @@ const HomePage = () => {
 
   const isSearching = searchQuery.trim().length > 0;
 
+  const hasActiveFilters = Object.values(filters).some((v) => v && v !== 'all' && v !== '0') || searchQuery.trim();
+
+  const listingQuery = () => {
+    const query = { limit: PAGE_SIZE };
+    if (searchQuery.trim()) query.search = searchQuery.trim();
+    Object.keys(filters).forEach((key) => {
+      if (filters[key] && filters[key] !== 'all') query[key] = filters[key];
+    });
+    return query;
+  };
+
+  // First page of the current search; responses to superseded searches are dropped
   const fetchUniversities = async () => {
+    const request = ++latestRequest.current;
+    const query = listingQuery();
+    currentQuery.current = query;
+    setLoading(true);
     try {
-      const data = await api.getUniversities();
-      setUniversities(data);
+      const data = await api.getUniversities({ ...query, include_total: true });
+      if (request !== latestRequest.current) return;
+      setUniversities(data.items);
+      setNextCursor(data.next_cursor);
+      setTotal(data.total);
+      if (!hasActiveFilters) setCatalogSize(data.total);
     } catch (error) {
       console.error('Error fetching universities:', error);
     } finally {
-      setLoading(false);
+      if (request === latestRequest.current) setLoading(false);
     }
   };
 
-  // Live search + filters — matches name, location, tags, courses, and description
-  const filteredUniversities = useMemo(() => {
-    let filtered = universities;
-
-    // Text search
-    if (searchQuery.trim()) {
-      const query = searchQuery.toLowerCase();
-      filtered = filtered.filter(
-        (uni) =>
-          uni.name.toLowerCase().includes(query) ||
-          uni.location.toLowerCase().includes(query) ||
-          uni.tags.some((tag) => tag.toLowerCase().includes(query)) ||
-          (uni.description && uni.description.toLowerCase().includes(query)) ||
-          (uni.courses &&
-            uni.courses.some(
-              (c) =>
-                c.course_name?.toLowerCase().includes(query) ||
-                c.description?.toLowerCase().includes(query) ||
-                c.category?.toLowerCase().includes(query)
-            ))
-      );
-    }
-
-    // Location filter
-    if (filters.location && filters.location !== 'all') {
-      filtered = filtered.filter((uni) =>
-        uni.location.toLowerCase().includes(filters.location.toLowerCase())
-      );
-    }
-
-    // Category filter — checks new list field AND legacy string field
-    if (filters.category && filters.category !== 'all') {
-      const cat = filters.category.toLowerCase();
-      filtered = filtered.filter((uni) => {
-        const inList = Array.isArray(uni.university_categories) &&
-          uni.university_categories.some((c) => c.toLowerCase() === cat);
-        const inLegacy = (uni.university_category || '').toLowerCase().includes(cat);
-        return inList || inLegacy;
-      });
+  const loadMore = async () => {
+    const request = latestRequest.current;
+    setLoadingMore(true);
+    try {
+      const data = await api.getUniversities({ ...currentQuery.current, cursor: nextCursor });
+      if (request !== latestRequest.current) return;
+      setUniversities((prev) => [...prev, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Error loading more universities:', error);
+    } finally {
+      setLoadingMore(false);
     }
-
-    // Sort so that featured items come first (1, 2, 3...)
-    filtered.sort((a, b) => {
-      const aPos = a.featured_position ? Number(a.featured_position) : 999;
-      const bPos = b.featured_position ? Number(b.featured_position) : 999;
-      return aPos - bPos;
-    });
-
-    return filtered;
-  }, [universities, searchQuery, filters]);
-
-  const hasActiveFilters = Object.values(filters).some((v) => v && v !== 'all' && v !== '0') || searchQuery.trim();
+  };
 
   const clearAllFilters = () => {
     setFilters({ location: '', category: '' });
     setSearchQuery('');
   };
 
-  const handleFilterSearch = async () => {
-    setLoading(true);
-    try {
-      const cleanFilters = {};
-      Object.keys(filters).forEach((key) => {
-        if (filters[key]) {
-          cleanFilters[key] = filters[key];
-        }
-      });
-      if (searchQuery) {
-        cleanFilters.search = searchQuery;
-      }
-      const data = await api.getUniversities(cleanFilters);
-      setUniversities(data);
-    } catch (error) {
-      console.error('Error filtering universities:', error);
-    } finally {
-      setLoading(false);
-    }
+  const handleFilterSearch = () => {
+    fetchUniversities();
   };
 
   const handleApplyClick = (university) => {
@@ -192,15 +171,7 @@ const HomePage = () => {
     setApplyModalOpen(true);
   };
 
-  const getMinFee = (courses) => {
-    if (!courses || courses.length === 0) return 'N/A';
-
-    const fees = courses.map((c) => c.fees).filter(f => f > 0);
-    if (fees.length === 0) return 'N/A';
-    const minFee = Math.min(...fees);
-
-    return `₹${(minFee / 100000).toFixed(1)}L`;
-  };
+  const formatFee = (fee) => (fee > 0 ? `₹${(fee / 100000).toFixed(1)}L` : 'N/A');
 
   return (
     <div className="min-h-screen bg-background">
@@ -374,7 +345,7 @@ const HomePage = () => {
           {hasActiveFilters && (
             <div className="flex items-center justify-center gap-2 mt-3">
               <span className="text-xs text-muted-foreground">
-                Showing {filteredUniversities.length} of {universities.length} universities
+                {total} {total === 1 ? 'university' : 'universities'} found
               </span>
               <button
                 onClick={clearAllFilters}
@@ -404,7 +375,7 @@ const HomePage = () => {
                   <GraduationCap className="w-4 h-4 text-primary" />
                 </div>
                 <div>
-                  <span className="text-lg font-bold text-secondary">{universities.length}+</span>
+                  <span className="text-lg font-bold text-secondary">{catalogSize}+</span>
                   <span className="text-xs text-muted-foreground ml-1">Universities</span>
                 </div>
               </div>
@@ -459,17 +430,17 @@ const HomePage = () => {
                 </Card>
               ))}
             </div>
-          ) : filteredUniversities.length === 0 ? (
+          ) : universities.length === 0 ? (
             <div className="text-center py-16">
               <p className="text-muted-foreground">No universities found. Try different filters.</p>
             </div>
           ) : (
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-              {filteredUniversities.map((university) => (
+              {universities.map((university) => (
                 <Card key={university.id} className="university-card overflow-hidden" data-testid={`university-card-${university.id}`}>
                   <div className="relative h-48 overflow-hidden">
                     <img
-                      src={university.main_photo}
+                      src={university.thumbnail_url || university.main_photo}
                       alt={university.name}
                       className="w-full h-full object-cover"
                     />
@@ -488,7 +459,7 @@ const HomePage = () => {
                     <div className="flex items-center justify-between mb-4 text-sm">
                       <div>
                         <div className="text-muted-foreground">Starting Annual Fees</div>
-                        <div className="font-semibold text-primary text-lg">{getMinFee(university.courses)}</div>
+                        <div className="font-semibold text-primary text-lg">{formatFee(university.min_fee)}</div>
                       </div>
                       <div className="text-right">
                         <div className="text-muted-foreground">Placement</div>
@@ -497,17 +468,17 @@ const HomePage = () => {
                     </div>
 
                     <div className="flex gap-2 mb-4 flex-wrap">
-                      {(university.courses || []).slice(0, 2).map((course, idx) => (
+                      {(university.course_names || []).slice(0, 2).map((courseName, idx) => (
                         <span
                           key={idx}
                           className="px-2 py-1 bg-muted text-xs rounded-md text-muted-foreground"
                         >
-                          {course.course_name}
+                          {courseName}
                         </span>
                       ))}
-                      {university.courses && university.courses.length > 2 && (
+                      {university.course_names && university.course_names.length > 2 && (
                         <span className="px-2 py-1 bg-muted text-xs rounded-md text-muted-foreground">
-                          +{university.courses.length - 2} more
+                          +{university.course_names.length - 2} more
                         </span>
                       )}
                     </div>
@@ -531,6 +502,14 @@ const HomePage = () => {
               ))}
             </div>
           )}
+
+          {!loading && nextCursor && (
+            <div className="flex justify-center mt-8">
+              <Button variant="outline" onClick={loadMore} disabled={loadingMore} data-testid="load-more-universities">
+                {loadingMore ? 'Loading...' : 'Load more universities'}
+              </Button>
+            </div>
+          )}
         </div>
       </section>
 
@@ -70,7 +70,7 @@ export const api = {
     return response.data;
   },
 
-  // Upload university photo (returns data URL)
+  // Upload university photo (returns a media URL)
   uploadUniversityPhoto: async (file) => {
     const formData = new FormData();
     formData.append('file', file);
@@ -80,10 +80,10 @@ export const api = {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data; // { photo_url: "data:image/...;base64,..." }
+    return response.data; // { photo_url: "/api/media/<sha256>" }
   },
 
-  // Bulk upload universities via Excel
+  // Bulk upload universities via Excel/CSV: queues an import job and polls until it finishes
   bulkUploadUniversities: async (file) => {
     const formData = new FormData();
     formData.append('file', file);
@@ -93,7 +93,19 @@ export const api = {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data;
+    const { job_id: jobId } = response.data;
+    for (;;) {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      const { data: job } = await axios.get(`${API_URL}/universities/bulk-upload/${jobId}`, {
+        headers: getAuthHeader(),
+      });
+      if (job.status === 'completed') return job;
+      if (job.status === 'failed') {
+        const error = new Error(job.detail);
+        error.response = { data: { detail: job.detail } };
+        throw error;
+      }
+    }
   },
 
   // Download bulk upload template
@@ -181,8 +193,11 @@ export const api = {
   },
 
   // Admin
-  getAdminStats: async () => {
+  // `summary` returns only the dashboard totals, read from counters; pass
+  // false for the per-status, per-university and per-day breakdowns
+  getAdminStats: async ({ summary = true } = {}) => {
     const response = await axios.get(`${API_URL}/admin/stats`, {
+      params: { summary },
       headers: getAuthHeader(),
     });
     return response.data;
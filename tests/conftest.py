@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+# server.py reads its settings at import; the client does not connect until used
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "edudham_test")
+os.environ.setdefault("JWT_SECRET", "test-secret-with-enough-bytes-for-hs256")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,23 @@
+import os
+import time
+from io import BytesIO
+
+import server
+from server import prune_export_snapshots, read_export_snapshot, write_export_snapshot
+
+
+def test_replaced_snapshot_outlives_the_grace_period_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "EXPORT_SNAPSHOT_DIR", tmp_path)
+    first = write_export_snapshot("uni-1", "csv", 1, BytesIO(b"name\nA\n"))
+    second = write_export_snapshot("uni-1", "csv", 2, BytesIO(b"name\nA\nB\n"))
+
+    assert read_export_snapshot("uni-1", "csv") == second
+    # A download that read the old manifest can still open the old file
+    assert (tmp_path / first["file"]).exists()
+
+    expired = time.time() - server.EXPORT_SNAPSHOT_GRACE_SECONDS - 1
+    os.utime(tmp_path / first["file"], (expired, expired))
+    os.utime(tmp_path / second["file"], (expired, expired))
+    prune_export_snapshots()
+    assert not (tmp_path / first["file"]).exists()
+    assert (tmp_path / second["file"]).exists()
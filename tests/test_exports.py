@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from server import format_export_date
+
+
+@pytest.mark.parametrize("value, expected", [
+    (datetime(2024, 3, 5, 14, 30, tzinfo=timezone.utc), "2024-03-05 14:30"),
+    # Not yet converted by `migrate.py datetimes`
+    ("2024-03-05T14:30:00+00:00", "2024-03-05 14:30"),
+    ("2024-03-05T14:30:00Z", "2024-03-05 14:30"),
+    ("last tuesday", "last tuesday"),
+    (None, ""),
+])
+def test_format_export_date(value, expected):
+    assert format_export_date(value) == expected
+
@@ -0,0 +1,168 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+import server
+
+
+def test_import_worker_survives_a_failed_job(monkeypatch):
+    jobs = [{"id": "a"}, {"id": "b"}]
+    ran = []
+
+    async def claim_import_job():
+        if jobs:
+            return jobs.pop(0)
+        raise asyncio.CancelledError
+
+    async def run_import_job(job):
+        ran.append(job['id'])
+        raise RuntimeError("could not mark the job finished")
+
+    monkeypatch.setattr(server, "claim_import_job", claim_import_job)
+    monkeypatch.setattr(server, "run_import_job", run_import_job)
+    try:
+        asyncio.run(server.import_worker())
+    except asyncio.CancelledError:
+        pass
+    assert ran == ["a", "b"]
+
+
+class StubWriteResult:
+    def __init__(self, upserted_ids=None):
+        self.upserted_ids = upserted_ids or {}
+
+
+class StubCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.docs:
+            raise StopAsyncIteration
+        return self.docs.pop(0)
+
+
+class StubUniversities:
+    """Just enough of a Motor collection for write_university_batch."""
+
+    def __init__(self, stored=(), results=()):
+        self.stored = list(stored)
+        self.results = list(results)
+        self.writes = []
+
+    async def bulk_write(self, ops, ordered=True, session=None):
+        self.writes.append(ops)
+        result = self.results.pop(0) if self.results else StubWriteResult()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def find(self, query, projection=None, session=None):
+        return StubCursor(doc for doc in self.stored if doc['name'] in query['name']['$in'])
+
+
+def use_universities(monkeypatch, collection):
+    monkeypatch.setattr(server, "db", SimpleNamespace(universities=collection))
+
+
+def test_upsert_rebuilds_search_terms_with_kept_categories(monkeypatch):
+    row = server.parse_university_row({"name": "Amity", "location": "Noida", "description": "x", "courses": "MBA"})
+    stored = {**row, "_id": 1, "university_categories": ["Private University"]}
+    collection = StubUniversities([stored], [StubWriteResult({})])
+    use_universities(monkeypatch, collection)
+    result = {"created": [], "updated": [], "errors": []}
+
+    asyncio.run(server.write_university_batch([(2, row)], "upsert", result))
+
+    assert result["updated"] == ["Amity"]
+    upsert, refresh = collection.writes
+    assert "university_categories" not in upsert[0]._doc["$set"]
+    assert refresh[0]._filter == {"_id": 1}
+    assert "private" in refresh[0]._doc["$set"]["search_terms"].split()
+
+
+def sheet_row(**values):
+    return {"name": "Amity", "location": "Noida", "description": "Private university", "placement_percentage": "", **values}
+
+
+def test_parse_university_row():
+    doc = server.parse_university_row(sheet_row(
+        courses="B.Tech, MBA ,", tags="private,", rating="4.5", placement_percentage=90, email="info@amity.edu",
+    ))
+    assert [course["course_name"] for course in doc["courses"]] == ["B.Tech", "MBA"]
+    assert doc["tags"] == ["private"]
+    assert doc["rating"] == 4.5 and doc["placement_percentage"] == 90.0
+    assert doc["contact_details"] == {"email": "info@amity.edu"}
+    assert "btech" in doc["search_terms"].split()
+    assert "thumbnail_url" not in doc
+
+
+@pytest.mark.parametrize("values", [{"location": ""}, {"description": None}, {"rating": "excellent"}])
+def test_parse_university_row_rejects_bad_rows(values):
+    with pytest.raises(ValueError):
+        server.parse_university_row(sheet_row(**values))
+
+
+def numbered(rows, start=2):
+    return iter(list(enumerate(rows, start=start)))
+
+
+def test_parse_university_chunk_skips_empty_rows_and_collects_errors():
+    rows = numbered([sheet_row(name="A"), {"name": "  "}, {}, sheet_row(name="B", location=""), sheet_row(name="C")])
+    parsed, errors, last_row = server.parse_university_chunk(rows, 10)
+    assert [(row, doc["name"]) for row, doc in parsed] == [(2, "A"), (6, "C")]
+    assert errors == ["Row 5: Missing required fields (name, location, description)"]
+    assert last_row == 6
+
+
+def test_parse_university_chunk_stops_at_size_and_resumes():
+    rows = numbered([sheet_row(name=str(n)) for n in range(5)])
+    parsed, _, last_row = server.parse_university_chunk(rows, 2)
+    assert [row for row, _ in parsed] == [2, 3] and last_row == 3
+    parsed, _, last_row = server.parse_university_chunk(rows, 10)
+    assert [row for row, _ in parsed] == [4, 5, 6] and last_row == 6
+    assert server.parse_university_chunk(rows, 10) == ([], [], None)
+
+
+def test_parse_university_chunk_skips_rows_already_imported():
+    rows = numbered([sheet_row(name=str(n)) for n in range(5)])
+    parsed, _, last_row = server.parse_university_chunk(rows, 10, skip_through_row=4)
+    assert [row for row, _ in parsed] == [5, 6] and last_row == 6
+
+
+def test_bulk_write_errors_are_reported_against_their_rows(monkeypatch):
+    batch = [(row, server.parse_university_row(sheet_row(name=name))) for row, name in ((2, "A"), (5, "B"), (9, "C"))]
+    error = BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "E11000 duplicate key"}], "upserted": []})
+    use_universities(monkeypatch, StubUniversities(results=[error]))
+    result = {"created": [], "updated": [], "errors": []}
+
+    asyncio.run(server.write_university_batch(batch, "insert", result))
+
+    assert result == {"created": ["A", "C"], "updated": [], "errors": ["Row 5: E11000 duplicate key"]}
+
+
+def test_upsert_reports_created_and_updated_rows(monkeypatch):
+    batch = [(row, server.parse_university_row(sheet_row(name=name))) for row, name in ((2, "A"), (3, "B"), (4, "C"))]
+    error = BulkWriteError({
+        "writeErrors": [{"index": 2, "errmsg": "Document failed validation"}],
+        "upserted": [{"index": 0, "_id": "x"}],
+    })
+    use_universities(monkeypatch, StubUniversities(results=[error]))
+    result = {"created": [], "updated": [], "errors": []}
+
+    asyncio.run(server.write_university_batch(batch, "upsert", result))
+
+    assert result == {"created": ["A"], "updated": ["B"], "errors": ["Row 4: Document failed validation"]}
+
+
+def test_bulk_write_errors_abort_a_transaction(monkeypatch):
+    batch = [(2, server.parse_university_row(sheet_row()))]
+    error = BulkWriteError({"writeErrors": [{"index": 0, "errmsg": "duplicate"}]})
+    use_universities(monkeypatch, StubUniversities(results=[error]))
+    with pytest.raises(BulkWriteError):
+        asyncio.run(server.write_university_batch(batch, "insert", {"created": [], "updated": [], "errors": []}, session=object()))
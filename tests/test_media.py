@@ -0,0 +1,138 @@
+import asyncio
+import base64
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+from starlette.requests import Request
+
+import server
+from server import decode_data_url, detect_image_type, externalize_photo, media_response, parse_byte_range
+
+
+def image_bytes(fmt: str) -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (8, 8), "orange").save(output, fmt)
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("fmt, content_type", [
+    ("JPEG", "image/jpeg"),
+    ("PNG", "image/png"),
+    ("WEBP", "image/webp"),
+    ("GIF", "image/gif"),
+])
+def test_detect_image_type(fmt, content_type):
+    assert detect_image_type(image_bytes(fmt)) == content_type
+
+
+@pytest.mark.parametrize("contents", [
+    b"<script>alert(document.cookie)</script>",
+    b'<svg xmlns="http://www.w3.org/2000/svg" onload="alert(1)"/>',
+    image_bytes("PNG")[:40],
+    b"",
+])
+def test_detect_image_type_rejects_non_images(contents):
+    assert detect_image_type(contents) is None
+
+
+def test_data_url_type_is_not_trusted():
+    html = base64.b64encode(b"<script>alert(1)</script>").decode()
+    assert decode_data_url(f"data:image/png;base64,{html}")[0] == "image/png"
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(externalize_photo(f"data:image/png;base64,{html}"))
+    assert excinfo.value.status_code == 400
+
+
+def test_external_urls_pass_through():
+    assert asyncio.run(externalize_photo("https://example.com/a.jpg")) == "https://example.com/a.jpg"
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-19", (10, 19)),
+    ("bytes=990-", (990, 999)),  # open-ended
+    ("bytes=-10", (990, 999)),  # suffix
+    ("bytes=-5000", (0, 999)),  # suffix longer than the file
+    ("bytes=900-5000", (900, 999)),  # end past the file is clamped
+    ("bytes=0-0", (0, 0)),
+    ("bytes=0-9,20-29", (0, 999)),  # multi-range: whole file
+    ("items=0-9", (0, 999)),  # unknown unit: whole file
+])
+def test_parse_byte_range(header, expected):
+    assert parse_byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1000-1010", "bytes=20-10", "bytes=-0", "bytes=a-b"])
+def test_parse_byte_range_unsatisfiable(header):
+    assert parse_byte_range(header, 1000) is None
+
+
+class StubGridOut:
+    def __init__(self, data, content_type="image/png"):
+        self.data = data
+        self.length = len(data)
+        self.metadata = {"content_type": content_type}
+        self.position = 0
+
+    def seek(self, position):
+        self.position = position
+
+    async def read(self, size):
+        chunk = self.data[self.position:self.position + size]
+        self.position += len(chunk)
+        return chunk
+
+
+class StubBucket:
+    def __init__(self, grid_out):
+        self.grid_out = grid_out
+
+    async def open_download_stream(self, digest):
+        return self.grid_out
+
+
+def fetch_media(monkeypatch, data, headers=(), content_type="image/png"):
+    monkeypatch.setattr(server, "media_bucket", lambda: StubBucket(StubGridOut(data, content_type)))
+    request = Request({"type": "http", "headers": [(k.encode(), v.encode()) for k, v in headers]})
+
+    async def fetch():
+        response = await media_response("d" * 64, request, "no-cache")
+        body = b""
+        if hasattr(response, "body_iterator"):
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        return response, body
+
+    return asyncio.run(fetch())
+
+
+@pytest.mark.parametrize("range_header, status, body, content_range", [
+    (None, 200, b"0123456789", None),
+    ("bytes=2-4", 206, b"234", "bytes 2-4/10"),
+    ("bytes=7-", 206, b"789", "bytes 7-9/10"),
+    ("bytes=-3", 206, b"789", "bytes 7-9/10"),
+    ("bytes=0-", 200, b"0123456789", None),  # the whole file is a plain 200
+    ("bytes=0-1,4-5", 200, b"0123456789", None),
+])
+def test_media_response_ranges(monkeypatch, range_header, status, body, content_range):
+    headers = [("range", range_header)] if range_header else []
+    response, content = fetch_media(monkeypatch, b"0123456789", headers)
+    assert response.status_code == status
+    assert content == body
+    assert response.headers["content-length"] == str(len(body))
+    assert response.headers.get("content-range") == content_range
+    assert response.headers["x-content-type-options"] == "nosniff"
+
+
+def test_media_response_unsatisfiable_range(monkeypatch):
+    response, _ = fetch_media(monkeypatch, b"0123456789", [("range", "bytes=10-")])
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */10"
+
+
+def test_media_response_not_modified_and_unknown_types(monkeypatch):
+    response, _ = fetch_media(monkeypatch, b"x", [("if-none-match", '"' + "d" * 64 + '"')])
+    assert response.status_code == 304
+    response, _ = fetch_media(monkeypatch, b"<svg/>", content_type="image/svg+xml")
+    assert response.headers["content-type"] == "application/octet-stream"
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import server
+from server import get_metrics
+
+
+def request(authorization=None) -> Request:
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({"type": "http", "method": "GET", "path": "/api/metrics", "headers": headers})
+
+
+def test_metrics_are_off_without_a_token(monkeypatch):
+    monkeypatch.setattr(server, "METRICS_TOKEN", None)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(get_metrics(request()))
+    assert excinfo.value.status_code == 404
+
+
+def test_metrics_require_the_token(monkeypatch):
+    monkeypatch.setattr(server, "METRICS_TOKEN", "s3cret")
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(get_metrics(request("Bearer wrong")))
+    assert excinfo.value.status_code == 401
+    response = asyncio.run(get_metrics(request("Bearer s3cret")))
+    assert b"mongo_pool_checked_out_connections" in response.body
@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from server import OTP_MAX_ATTEMPTS, OTPVerify, verify_otp
+
+EMAIL = "manager@example.com"
+
+
+def matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if "$gt" in condition and not value > condition["$gt"]:
+                return False
+            if "$lt" in condition and not value < condition["$lt"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class StubOTPs:
+    def __init__(self, doc):
+        self.doc = doc
+
+    async def find_one_and_delete(self, query):
+        if self.doc and matches(self.doc, query):
+            doc, self.doc = self.doc, None
+            return doc
+        return None
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        if not self.doc or not matches(self.doc, query):
+            return None
+        for field, amount in update["$inc"].items():
+            self.doc[field] = self.doc.get(field, 0) + amount
+        return dict(self.doc)
+
+    async def delete_one(self, query):
+        if self.doc and matches(self.doc, query):
+            self.doc = None
+
+
+class StubUsers:
+    async def find_one_and_update(self, query, update, projection=None):
+        return None
+
+
+@pytest.fixture
+def otps(monkeypatch):
+    async def hash_password(password):
+        return "hash"
+
+    def install(expires_in=timedelta(minutes=5)):
+        collection = StubOTPs({"email": EMAIL, "otp": "123456", "expires_at": datetime.now(timezone.utc) + expires_in, "attempts": 0})
+        monkeypatch.setattr(server, "db", SimpleNamespace(otps=collection, users=StubUsers()))
+        return collection
+
+    monkeypatch.setattr(server, "hash_password", hash_password)
+    return install
+
+
+def verify(otp):
+    try:
+        asyncio.run(verify_otp(OTPVerify(email=EMAIL, otp=otp, new_password="new-password")))
+    except HTTPException as e:
+        return e.detail
+    return "ok"
+
+
+def test_correct_code_is_accepted_on_the_last_try(otps):
+    collection = otps()
+    assert [verify("000000") for _ in range(OTP_MAX_ATTEMPTS - 1)] == ["Invalid OTP"] * (OTP_MAX_ATTEMPTS - 1)
+    assert verify("123456") == "ok"
+    assert collection.doc is None
+    assert verify("123456") == "OTP not found"  # consumed
+
+
+def test_last_wrong_try_deletes_the_otp(otps):
+    collection = otps()
+    for _ in range(OTP_MAX_ATTEMPTS - 1):
+        verify("000000")
+    assert verify("000000") == "Too many attempts, request a new OTP"
+    assert collection.doc is None
+    assert verify("123456") == "OTP not found"
+
+
+def test_expired_otp_is_rejected(otps):
+    otps(expires_in=timedelta(minutes=-1))
+    assert verify("123456") == "OTP expired"
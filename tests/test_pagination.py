@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from server import decode_cursor, encode_cursor, keyset_filter
+
+
+def raw_cursor(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+
+
+def test_cursor_round_trips_datetimes():
+    created_at = datetime(2024, 1, 10, 10, 0, tzinfo=timezone.utc)
+    position = decode_cursor(encode_cursor({"created_at": created_at, "id": "a"}))
+    assert position == {"created_at": created_at, "id": "a"}
+
+
+@pytest.mark.parametrize("value", [4.5, 7, "Amity", None, True, datetime(2024, 1, 1, tzinfo=timezone.utc)])
+def test_keyset_filter_accepts_scalars(value):
+    assert keyset_filter("rating", value, "last-id", descending=True) == {"$or": [
+        {"rating": {"$lt": value}},
+        {"rating": value, "id": {"$lt": "last-id"}},
+    ]}
+
+
+@pytest.mark.parametrize("position", [
+    {"value": {"$ne": None}, "id": "x"},
+    {"value": [1, 2], "id": "x"},
+    {"value": 1, "id": {"$gt": ""}},
+])
+def test_keyset_filter_rejects_operators(position):
+    position = decode_cursor(raw_cursor(position))
+    with pytest.raises(HTTPException) as excinfo:
+        keyset_filter("rating", position["value"], position["id"], descending=True)
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", raw_cursor([1, 2]), raw_cursor({"created_at": {"$date": 5}})])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor)
+    assert excinfo.value.status_code == 400
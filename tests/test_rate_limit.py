@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import server
+from server import MemoryRateLimitStore, client_ip, enforce_rate_limit
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(server.time, "monotonic", clock)
+    return clock
+
+
+def make_request(forwarded_for=None, peer="10.0.0.2") -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for is not None else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 443)})
+
+
+def test_forwarded_for_ignored_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(server, "TRUSTED_PROXY_HOPS", 0)
+    assert client_ip(make_request("1.2.3.4")) == "10.0.0.2"
+
+
+@pytest.mark.parametrize("forwarded_for, expected", [
+    ("203.0.113.7", "203.0.113.7"),
+    ("1.2.3.4, 203.0.113.7", "203.0.113.7"),
+    ("spoofed, 1.2.3.4 ,203.0.113.7", "203.0.113.7"),
+    ("", "10.0.0.2"),
+    (None, "10.0.0.2"),
+])
+def test_client_is_the_hop_added_by_the_proxy(monkeypatch, forwarded_for, expected):
+    monkeypatch.setattr(server, "TRUSTED_PROXY_HOPS", 1)
+    assert client_ip(make_request(forwarded_for)) == expected
+
+
+def test_multiple_proxy_hops(monkeypatch):
+    monkeypatch.setattr(server, "TRUSTED_PROXY_HOPS", 2)
+    assert client_ip(make_request("1.2.3.4, 203.0.113.7, 10.0.0.9")) == "203.0.113.7"
+    assert client_ip(make_request("203.0.113.7")) == "10.0.0.2"
+
+
+def take(store, key="k", capacity=3, period=60):
+    return asyncio.run(store.take(key, capacity, period))
+
+
+def test_bucket_allows_a_burst_up_to_capacity(clock):
+    store = MemoryRateLimitStore()
+    assert [take(store) for _ in range(3)] == [0, 0, 0]
+    assert take(store) == pytest.approx(20)  # one token per 20s
+
+
+def test_bucket_refills_over_time(clock):
+    store = MemoryRateLimitStore()
+    for _ in range(3):
+        take(store)
+    clock.now += 5
+    assert take(store) == pytest.approx(15)
+    clock.now += 15
+    assert take(store) == 0
+    assert take(store) == pytest.approx(20)
+    clock.now += 3600  # refill stops at capacity
+    assert [take(store) for _ in range(3)] == [0, 0, 0]
+    assert take(store) > 0
+
+
+def test_buckets_are_per_key_and_least_recently_used_are_evicted(clock):
+    store = MemoryRateLimitStore(max_keys=2)
+    take(store, "a", capacity=1)
+    take(store, "b", capacity=1)
+    assert take(store, "a", capacity=1) > 0
+    take(store, "c", capacity=1)  # evicts "b", the least recently used
+    assert list(store._buckets) == ["a", "c"]
+    assert take(store, "b", capacity=1) == 0
+
+
+def test_enforce_rate_limit_raises_429_with_retry_after(monkeypatch, clock):
+    monkeypatch.setattr(server, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(server, "TRUSTED_PROXY_HOPS", 0)
+    monkeypatch.setattr(server, "rate_limit_store", MemoryRateLimitStore())
+    request = make_request()
+    capacity, period = next((capacity, period) for kind, capacity, period in server.RATE_LIMITS["login"] if kind == "email")
+    for _ in range(capacity):
+        asyncio.run(enforce_rate_limit("login", request, "Student@Example.com"))
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(enforce_rate_limit("login", request, "student@example.com"))
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers == {"Retry-After": str(period // capacity)}
+    asyncio.run(enforce_rate_limit("login", request, "other@example.com"))
+
+
+def test_enforce_rate_limit_disabled(monkeypatch, clock):
+    monkeypatch.setattr(server, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(server, "rate_limit_store", MemoryRateLimitStore())
+    for _ in range(100):
+        asyncio.run(enforce_rate_limit("register", make_request()))
@@ -0,0 +1,29 @@
+import asyncio
+
+import server
+from server import cached, response_cache
+
+
+def test_cached_values_follow_collection_versions(monkeypatch):
+    versions = {"homepage_config": 1}
+    loads = []
+
+    async def fake_versions(names, database=None):
+        return {name: versions[name] for name in names}
+
+    async def load():
+        loads.append(versions["homepage_config"])
+        return {"site_name": f"v{versions['homepage_config']}"}
+
+    monkeypatch.setattr(server, "get_collection_versions", fake_versions)
+    response_cache.clear()
+
+    async def get():
+        return await cached("homepage_config", load, ("homepage_config",))
+
+    assert asyncio.run(get()) == {"site_name": "v1"}
+    assert asyncio.run(get()) == {"site_name": "v1"}
+    # A write in another worker only shows up here as a new version
+    versions["homepage_config"] = 2
+    assert asyncio.run(get()) == {"site_name": "v2"}
+    assert loads == [1, 2]
@@ -0,0 +1,79 @@
+import pytest
+
+import re
+
+from server import SEARCH_FIELD_WEIGHTS, build_search_terms, normalize_search_query, tokenize_search_text
+
+
+def text_search_matches(doc, search):
+    """$text with quoted terms: every phrase must occur in some indexed field."""
+    doc = {**doc, "search_terms": build_search_terms(doc)}
+    values = []
+    for field in SEARCH_FIELD_WEIGHTS:
+        if field.startswith("courses."):
+            values += [course.get(field.split(".")[1]) for course in doc.get("courses", [])]
+        else:
+            value = doc.get(field)
+            values += value if isinstance(value, list) else [value]
+    text = " ".join(value for value in values if isinstance(value, str)).lower()
+    phrases = re.findall(r'"([^"]+)"', normalize_search_query(search))
+    return bool(phrases) and all(phrase in text for phrase in phrases)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("B.Tech", ["btech", "b", "tech"]),
+    ("B. Tech", ["btech", "b", "tech"]),
+    ("Ph.D", ["phd", "ph", "d"]),
+    ("B.A. English", ["ba", "b", "a", "english"]),
+    ("M.B.A. Ph.D", ["mba", "phd", "m", "b", "a", "ph", "d"]),
+    ("C. S. J. M. University Kanpur", ["csjm", "c", "s", "j", "m", "university", "kanpur"]),
+    ("St. Xavier's College", ["st", "xavier", "s", "college"]),
+    ("Lucknow", ["lucknow"]),
+    ("", []),
+    (None, []),
+])
+def test_tokenize_search_text(text, expected):
+    assert tokenize_search_text(text) == expected
+
+
+def test_abbreviations_do_not_swallow_the_next_word():
+    for text, word in (("B.A. English", "english"), ("C. S. J. M. University", "university")):
+        tokens = tokenize_search_text(text)
+        assert word in tokens
+        assert not any(token != word and token.endswith(word) for token in tokens)
+
+
+def test_query_matches_stored_terms():
+    terms = build_search_terms({"name": "C. S. J. M. University", "courses": [{"course_name": "M.B.A."}]}).split()
+    for query in ("csjm", "C.S.J.M.", "MBA", "M.B.A.", "univ", "C. S. J. M. univ"):
+        assert set(normalize_search_query(query).replace('"', '').split()) <= set(terms)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("B.Tech", '"btech"'),
+    ("B. Tech CSE", '"btech" "cse"'),
+    ("B.A. English", '"ba" "english"'),
+    ("Ph.D Lucknow", '"phd" "lucknow"'),
+    ('"B.Tech" -MBA', '"btech" "mba"'),
+    ("", ""),
+])
+def test_normalize_search_query_quotes_collapsed_tokens(query, expected):
+    assert normalize_search_query(query) == expected
+
+
+def test_abbreviation_query_does_not_match_its_parts():
+    nit = {
+        "name": "National Institute of Technology",
+        "location": "Bhopal",
+        "courses": [{"course_name": "M.Tech", "category": "Engineering"}, {"course_name": "B.Sc Physics"}],
+    }
+    iit = {"name": "Indian Institute of Technology", "courses": [{"course_name": "B.Tech", "category": "Engineering"}]}
+    assert not text_search_matches(nit, "B.Tech")
+    assert text_search_matches(iit, "B.Tech")
+    assert text_search_matches(iit, "btec")
+
+
+def test_every_query_word_is_required():
+    iit = {"name": "Indian Institute of Technology", "location": "Kanpur", "courses": [{"course_name": "B.Tech"}]}
+    assert text_search_matches(iit, "B.Tech Kanpur")
+    assert not text_search_matches(iit, "B.Tech Lucknow")
@@ -0,0 +1,37 @@
+import pytest
+from fastapi import HTTPException
+
+from server import parse_university_fields, shape_university, university_projection
+
+
+def test_card_preset_projects_only_card_fields():
+    selected = parse_university_fields("card")
+    projection = university_projection(selected)
+    assert projection["main_photo"] == 1
+    assert projection["courses.course_name"] == 1
+    assert "description" not in projection and "photo_gallery" not in projection
+
+
+def test_shape_university_computes_virtual_fields():
+    doc = {
+        "id": "u1",
+        "main_photo": "/api/media/" + "a" * 64,
+        "courses": [{"course_name": "B.Tech"}, {"course_name": "MBA"}],
+    }
+    shaped = shape_university(doc, ["id", "thumbnail_url", "course_names"])
+    assert shaped == {"id": "u1", "thumbnail_url": "/api/media/" + "a" * 64 + "/thumb", "course_names": ["B.Tech", "MBA"]}
+
+
+def test_full_and_unknown_fields():
+    assert parse_university_fields("full") is None
+    assert parse_university_fields("name") == ["id", "name"]
+    with pytest.raises(HTTPException):
+        parse_university_fields("name,password_hash")
+
+
+def test_legacy_category_is_selectable():
+    assert "university_category" in parse_university_fields("card")
+    assert parse_university_fields("name,university_category") == ["id", "name", "university_category"]
+    assert shape_university({"id": "u1", "university_category": "Engineering"}, ["id", "university_category"]) == {
+        "id": "u1", "university_category": "Engineering",
+    }
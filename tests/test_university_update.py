@@ -0,0 +1,82 @@
+import asyncio
+import copy
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from server import Principal, UniversityUpdate, update_university
+
+ADMIN = Principal(user_id="u1", email="admin@example.com", role="admin", expires_at=0)
+
+
+class StubUniversities:
+    """One stored university; `concurrent` edits it between our read and write."""
+
+    def __init__(self, doc, concurrent=()):
+        self.doc = doc
+        self.concurrent = list(concurrent)
+
+    async def find_one(self, query, projection=None):
+        return copy.deepcopy(self.doc) if self.doc and self.doc["id"] == query["id"] else None
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        if self.concurrent:
+            self.doc.update(self.concurrent.pop(0))
+        if not self.doc or any(self.doc.get(field) != value for field, value in query.items()):
+            return None
+        self.doc.update(update["$set"])
+        return copy.deepcopy(self.doc)
+
+
+@pytest.fixture
+def universities(monkeypatch):
+    async def nothing(*args, **kwargs):
+        return None
+
+    def install(doc, concurrent=()):
+        collection = StubUniversities(doc, concurrent)
+        monkeypatch.setattr(server, "db", SimpleNamespace(universities=collection))
+        return collection
+
+    monkeypatch.setattr(server, "universities_changed", nothing)
+    monkeypatch.setattr(server, "externalize_university_photos", nothing)
+    return install
+
+
+def stored_university():
+    return {
+        "id": "amity", "name": "Amity", "location": "Noida", "description": "x",
+        "courses": [{"course_name": "MBA", "fees": 100000.0}],
+    }
+
+
+def test_update_writes_derived_fields_with_the_changes(universities):
+    collection = universities(stored_university())
+    result = asyncio.run(update_university("amity", UniversityUpdate(location="Lucknow"), ADMIN))
+    assert result["location"] == "Lucknow"
+    assert "lucknow" in collection.doc["search_terms"].split()
+    assert collection.doc["min_fee"] == 100000.0
+
+
+def test_concurrent_change_is_merged_before_deriving(universities):
+    collection = universities(stored_university(), concurrent=[{"courses": [{"course_name": "B.Tech", "fees": 200000.0}]}])
+    asyncio.run(update_university("amity", UniversityUpdate(location="Lucknow"), ADMIN))
+    terms = collection.doc["search_terms"].split()
+    assert "btech" in terms and "mba" not in terms
+    assert collection.doc["min_fee"] == 200000.0
+
+
+def test_update_gives_up_when_always_raced(universities):
+    universities(stored_university(), concurrent=[{"tags": [str(n)]} for n in range(server.UNIVERSITY_UPDATE_ATTEMPTS)])
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(update_university("amity", UniversityUpdate(location="Lucknow"), ADMIN))
+    assert excinfo.value.status_code == 409
+
+
+def test_update_missing_university(universities):
+    universities(None)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(update_university("amity", UniversityUpdate(location="Lucknow"), ADMIN))
+    assert excinfo.value.status_code == 404